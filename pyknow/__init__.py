@@ -1,6 +1,6 @@
 from .conditionalelement import AND, OR, NOT, TEST, EXISTS, FORALL
 from .engine import KnowledgeEngine
-from .fact import Fact, InitialFact, Field
+from .fact import Fact, FactTemplate, InitialFact, Field
 from .fieldconstraint import L, W, P
 from .rule import Rule
 from .watchers import watch, unwatch
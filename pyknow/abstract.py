@@ -1,6 +1,7 @@
 import abc
 
 from pyknow import watchers
+from pyknow.agenda import Agenda
 
 
 class Matcher(metaclass=abc.ABCMeta):
@@ -29,6 +30,10 @@ class Strategy(metaclass=abc.ABCMeta):
         super().__init__(*args, **kwargs)
         self.resolved = dict()
 
+    def new_agenda(self):
+        """Return a new empty agenda to be used with this strategy."""
+        return Agenda()
+
     @abc.abstractmethod
     def _update_agenda(self, agenda, added, removed):  # pragma: no cover
         pass
@@ -40,7 +45,7 @@ class Strategy(metaclass=abc.ABCMeta):
                     " <== %r: %s %s",
                     getattr(act.rule, '__name__', None),
                     ", ".join(str(f) for f in act.facts),
-                    "[EXECUTED]" if act not in agenda.activations else "")
+                    "[EXECUTED]" if act not in agenda else "")
 
             for act in added:
                 watchers.ACTIVATIONS.info(
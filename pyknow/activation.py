@@ -2,33 +2,69 @@
 Activations represent rules that matches against a specific factlist.
 
 """
+from collections.abc import Hashable
 from functools import total_ordering
 
+from pyknow.utils import frozendict
+
 
 @total_ordering
 class Activation:
     """
     Activation object
+
+    Activations are immutable: `rule`, `facts` and `context` can't be
+    changed after creation, so the hash is computed only once. The only
+    writable attribute is `key`, set by the strategy the first time the
+    activation reaches the agenda.
+
+    The `context` can be any mapping: hashable mappings (like the
+    context of the token of the matcher) are kept as they are and the
+    rest are copied to a `frozendict`. The arguments of the rule are
+    only built by `get_kwargs`. The context is not part of the hash.
+
     """
-    def __init__(self, rule, facts, context=None):
-        self.rule = rule
-        self.facts = set(facts)
-        self.key = None
+    __slots__ = ('rule', 'facts', 'context', 'key', '_hash')
+
+    def __init__(self, rule, facts, context=None, key=None):
+        setattr_ = super().__setattr__
+
+        facts = frozenset(facts)
         if context is None:
-            self.context = dict()
-        else:
-            self.context = context
+            context = frozendict()
+        elif not isinstance(context, Hashable):
+            context = frozendict(context)
+
+        setattr_('rule', rule)
+        setattr_('facts', facts)
+        setattr_('context', context)
+        setattr_('key', key)
+        setattr_('_hash', hash((rule, facts)))
+
+    def __setattr__(self, name, value):
+        if name != 'key':
+            raise AttributeError(
+                "Activation attribute %r is read-only" % name)
+        super().__setattr__(name, value)
+
+    def get_kwargs(self):
+        """Return the variables of the context to be passed to the rule."""
+        return {k: v
+                for k, v in self.context.items()
+                if isinstance(k, str) and not k.startswith('__')}
 
     def __repr__(self):  # pragma: no cover
         return "Activation(rule={}, facts={}, context={})".format(
-            self.rule, self.facts, self.context)
+            self.rule, self.facts, dict(self.context))
 
     def __eq__(self, other):
+        if self is other:
+            return True
         try:
-            return (self.context == other.context
-                    and self.facts == other.facts
+            return (self._hash == other._hash
                     and self.rule == other.rule
-                    and self.key == other.key)
+                    and self.facts == other.facts
+                    and self.context == other.context)
         except AttributeError:
             return False
 
@@ -36,6 +72,4 @@ class Activation:
         return self.key < other.key
 
     def __hash__(self):
-        return hash((self.rule,
-                     frozenset(self.facts),
-                     frozenset(self.context.items())))
+        return self._hash
@@ -1,3 +1,9 @@
+from collections import deque
+import bisect
+import heapq
+import itertools
+
+
 class Agenda:
     """
 
@@ -15,10 +21,36 @@ class Agenda:
     def __repr__(self):  # pragma: no cover
         return "\n".join(
             "{idx}: {rule} {facts}".format(idx=idx,
-                                           rule=act.activation.rule.__name__,
-                                           facts=act.activation.facts)
+                                           rule=act.rule.__name__,
+                                           facts=act.facts)
             for idx, act in enumerate(self.activations))
 
+    def __contains__(self, activation):
+        return activation in self.activations
+
+    def __len__(self):
+        return len(self.activations)
+
+    def add(self, activation):
+        """
+        Add an activation (with its `key` already set) to the agenda.
+
+        Activations with the same key are run in insertion order.
+
+        """
+        bisect.insort_left(self.activations, activation)
+
+    def remove(self, activation):
+        """Remove an activation, if present, from the agenda."""
+        idx = bisect.bisect_left(self.activations, activation)
+        # Look over all the activations with the same key.
+        while (idx < len(self.activations)
+               and not activation < self.activations[idx]):
+            if self.activations[idx] == activation:
+                del self.activations[idx]
+                return
+            idx += 1
+
     def get_next(self):
         """Returns the next activation, removes it from activations list."""
 
@@ -26,3 +58,212 @@ class Agenda:
             return self.activations.pop()
         except IndexError:
             return None
+
+
+class _ReversedKey:
+    """Wrap a key inverting its order, to use a min-heap as a max-heap."""
+
+    __slots__ = ('key', )
+
+    def __init__(self, key):
+        self.key = key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+
+class HeapAgenda(Agenda):
+    """
+    Agenda backed by a binary heap.
+
+    Insertion and removal of activations are O(log n). Removed
+    activations are only marked as deleted (found through an index of
+    the heap entries) and discarded when they reach the top of the
+    heap; the heap is rebuilt when most of it are deleted entries.
+
+    The `activations` attribute is a (read-only) list sorted like the
+    one of `Agenda`, built on request.
+
+    Activations with the same key are run in insertion order or, with
+    `lifo=True`, the last added first.
+
+    """
+
+    def __init__(self, lifo=False):
+        self.lifo = lifo
+        self._heap = list()
+        self._index = dict()
+        self._counter = itertools.count()
+        self._removed = 0
+
+    @property
+    def activations(self):
+        """Activations ordered like `Agenda`, the last is the next to run."""
+        return [entry[-1]
+                for entry in sorted(self._heap, reverse=True)
+                if entry[-1] is not None]
+
+    def __contains__(self, activation):
+        return activation in self._index
+
+    def __len__(self):
+        return len(self._heap) - self._removed
+
+    def add(self, activation):
+        """Add an activation (with its `key` already set) to the agenda."""
+        order = next(self._counter)
+        entry = [_ReversedKey(activation.key),
+                 -order if self.lifo else order,
+                 activation]
+        self._index.setdefault(activation, list()).append(entry)
+        heapq.heappush(self._heap, entry)
+
+    def remove(self, activation):
+        """Remove an activation, if present, from the agenda."""
+        for entry in self._index.get(activation, ()):
+            if entry[-1] == activation:
+                self._discard(entry)
+                break
+        else:
+            return
+
+        self._removed += 1
+        if self._removed > len(self._heap) // 2:
+            self._heap = [entry for entry in self._heap
+                          if entry[-1] is not None]
+            heapq.heapify(self._heap)
+            self._removed = 0
+
+    def _discard(self, entry):
+        """Mark the heap `entry` as removed and drop it from the index."""
+        activation = entry[-1]
+        entries = self._index[activation]
+        for idx, other in enumerate(entries):
+            if other is entry:
+                del entries[idx]
+                break
+        if not entries:
+            del self._index[activation]
+        entry[-1] = None
+
+    def get_next(self):
+        """Returns the next activation, removes it from the agenda."""
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            if entry[-1] is None:
+                self._removed -= 1
+            else:
+                activation = entry[-1]
+                self._discard(entry)
+                return activation
+
+        return None
+
+
+class SalienceAgenda(Agenda):
+    """
+    Agenda keeping one queue of activations per salience level.
+
+    The `key` of the activations is their salience. The activations of
+    each level are run in LIFO order (the last added is the next to
+    run) or, with `lifo=False`, in FIFO order. The non-empty levels are
+    kept in a sorted list, so adding and running activations are O(1)
+    while the number of levels is small.
+
+    Removed activations are only marked as deleted and discarded when
+    they reach the end of their queue (or when most of the queue are
+    deleted entries).
+
+    """
+
+    def __init__(self, lifo=True):
+        self.lifo = lifo
+        self._levels = list()
+        self._queues = dict()
+        self._sizes = dict()
+        self._index = dict()
+
+    @property
+    def activations(self):
+        """Activations ordered like `Agenda`, the last is the next to run."""
+        activations = list()
+        for salience in self._levels:
+            queue = self._queues[salience]
+            if not self.lifo:
+                queue = reversed(queue)
+            activations.extend(entry[0] for entry in queue
+                               if entry[0] is not None)
+        return activations
+
+    def __contains__(self, activation):
+        return activation in self._index
+
+    def __len__(self):
+        return sum(self._sizes.values())
+
+    def add(self, activation):
+        """Add an activation (with its salience as `key`) to the agenda."""
+        salience = activation.key
+        entry = [activation]
+        self._index.setdefault(activation, list()).append(entry)
+
+        try:
+            self._queues[salience].append(entry)
+        except KeyError:
+            self._queues[salience] = deque([entry])
+            self._sizes[salience] = 0
+
+        self._sizes[salience] += 1
+        if self._sizes[salience] == 1:
+            bisect.insort(self._levels, salience)
+
+    def remove(self, activation):
+        """Remove an activation, if present, from the agenda."""
+        for entry in self._index.get(activation, ()):
+            if entry[0] == activation:
+                self._discard(entry)
+                break
+        else:
+            return
+
+        salience = activation.key
+        queue = self._queues.get(salience, ())
+        if len(queue) > 2 * self._sizes.get(salience, 0):
+            self._queues[salience] = deque(entry for entry in queue
+                                           if entry[0] is not None)
+
+    def _discard(self, entry):
+        """Mark the `entry` as removed and update the level sizes."""
+        activation = entry[0]
+        entries = self._index[activation]
+        for idx, other in enumerate(entries):
+            if other is entry:
+                del entries[idx]
+                break
+        if not entries:
+            del self._index[activation]
+        entry[0] = None
+
+        salience = activation.key
+        self._sizes[salience] -= 1
+        if not self._sizes[salience]:
+            del self._levels[bisect.bisect_left(self._levels, salience)]
+            del self._queues[salience]
+            del self._sizes[salience]
+
+    def get_next(self):
+        """Returns the next activation, removes it from the agenda."""
+        if not self._levels:
+            return None
+
+        queue = self._queues[self._levels[-1]]
+        pop = queue.pop if self.lifo else queue.popleft
+        while True:
+            entry = pop()
+            if entry[0] is not None:
+                activation = entry[0]
+                self._discard(entry)
+                return activation
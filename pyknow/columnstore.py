@@ -0,0 +1,253 @@
+"""
+Column-wise storage of the facts of one `FactTemplate` class.
+
+Used by the `FactList` for the template classes with `__columnar__` set
+to `True`.
+
+"""
+from array import array
+from bisect import bisect_left
+from itertools import compress
+import weakref
+
+from pyknow.fact import Field, FactTemplate
+
+
+#: Value of the cells of the unset fields.
+UNSET = object()
+
+#: Array type codes of the fields with these schemas.
+TYPECODES = {int: 'q', float: 'd'}
+
+
+class ColumnStore:
+    """
+    Facts of one `FactTemplate` class stored column-wise.
+
+    Every field is kept in its own column: an `array` for the fields
+    declared as `int` or `float`, a `list` for the rest. The cells of
+    the `array` columns where the field is not set are marked in a
+    bitmap of present values (one per column, in `present`). A value
+    which doesn't fit in the array, because its type is not exactly the
+    one of the field (for example a `bool` in an `int` field) or it is
+    out of range, turns the column into a `list` for good, with the
+    unset cells as `UNSET`.
+
+    The fact ids are kept in a sorted `array`, so the row of a fact is
+    found by bisection, and retracted rows are marked as dead and
+    dropped when they are the majority.
+
+    The fact objects are not kept: `get` builds a new fact from its row
+    (a `FactTemplate` instance only holding references to the values)
+    unless the fact is still alive, for example because the network
+    captured it. In that case the same object is returned.
+
+    """
+    def __init__(self, fact_class):
+        if not issubclass(fact_class, FactTemplate):
+            raise TypeError("Only FactTemplate facts can be stored by column")
+
+        self.fact_class = fact_class
+        self.fields = tuple(fact_class.__fields__)
+        self.types = [self._get_type(fact_class.__fields__[name])
+                      for name in self.fields]
+        self.columns = [array(TYPECODES[type_]) if type_ is not None
+                        else list()
+                        for type_ in self.types]
+        self.present = [bytearray() if type_ is not None else None
+                        for type_ in self.types]
+        self.ids = array('q')
+        self.alive = bytearray()
+        self.dead = 0
+        self.views = weakref.WeakValueDictionary()
+
+    @staticmethod
+    def _get_type(field):
+        definition = getattr(field, 'schema_definition', None)
+        if definition in TYPECODES:
+            return definition
+        else:
+            return None
+
+    def __len__(self):
+        return len(self.ids) - self.dead
+
+    def __contains__(self, idx):
+        try:
+            self._get_row(idx)
+        except KeyError:
+            return False
+        else:
+            return True
+
+    def __iter__(self):
+        """Iterate over the ids of the stored facts, in order."""
+        return compress(self.ids, self.alive)
+
+    def _get_row(self, idx):
+        row = bisect_left(self.ids, idx)
+        if row < len(self.ids) and self.ids[row] == idx and self.alive[row]:
+            return row
+        else:
+            raise KeyError(idx)
+
+    @staticmethod
+    def _store(column, row, value):
+        if row == len(column):
+            column.append(value)
+        else:
+            column[row] = value
+
+    def _set_cell(self, col, row, value):
+        column = self.columns[col]
+        if isinstance(column, array):
+            present = self.present[col]
+            if value is UNSET:
+                self._store(column, row, 0)
+                return self._store(present, row, 0)
+            elif type(value) is self.types[col]:
+                try:
+                    self._store(column, row, value)
+                except OverflowError:
+                    pass
+                else:
+                    return self._store(present, row, 1)
+            # The values of this field don't fit in the array anymore.
+            column = self.columns[col] = list(self._get_cells(col))
+            self.types[col] = None
+            self.present[col] = None
+
+        self._store(column, row, value)
+
+    def _get_cells(self, col):
+        """
+        Return the values of the column `col`, the unset ones as `UNSET`:
+        the column itself if all of them are present.
+
+        """
+        column = self.columns[col]
+        present = self.present[col]
+        if present is None or 0 not in present:
+            return column
+        else:
+            return [value if flag else UNSET
+                    for value, flag in zip(column, present)]
+
+    def _get_values(self, fact):
+        slots = fact.__field_slots__
+        for name in self.fields:
+            try:
+                yield slots[name].__get__(fact)
+            except AttributeError:
+                yield UNSET
+
+    def append(self, fact):
+        """Store the declared `fact`, newer than the stored ones."""
+        idx = fact.__factid__
+        if self.ids and idx <= self.ids[-1]:
+            raise ValueError("Facts must be stored in declaration order.")
+
+        row = len(self.ids)
+        for col, value in enumerate(self._get_values(fact)):
+            self._set_cell(col, row, value)
+        self.ids.append(idx)
+        self.alive.append(1)
+
+        self.views[idx] = fact
+
+    def update(self, fact):
+        """Store the current values of the stored `fact`."""
+        row = self._get_row(fact.__factid__)
+        for col, value in enumerate(self._get_values(fact)):
+            self._set_cell(col, row, value)
+
+    def remove(self, idx):
+        """Remove the fact `idx`."""
+        row = self._get_row(idx)
+        self.alive[row] = 0
+        self.dead += 1
+        self.views.pop(idx, None)
+
+        for column in self.columns:
+            if not isinstance(column, array):
+                column[row] = UNSET
+
+        if self.dead > len(self.ids) // 2:
+            self.compact()
+
+    def compact(self):
+        """Drop the rows of the removed facts."""
+        if not self.dead:
+            return
+
+        alive = self.alive
+        self.columns = [
+            array(column.typecode, compress(column, alive))
+            if isinstance(column, array)
+            else list(compress(column, alive))
+            for column in self.columns]
+        self.present = [
+            bytearray(compress(present, alive)) if present is not None
+            else None
+            for present in self.present]
+        self.ids = array('q', compress(self.ids, alive))
+        self.alive = bytearray([1]) * len(self.ids)
+        self.dead = 0
+
+    def _build(self, row):
+        fact = self.fact_class()
+        for name, column, present in zip(self.fields, self.columns,
+                                         self.present):
+            value = column[row]
+            if value is not UNSET and (present is None or present[row]):
+                setattr(fact, name, value)
+        fact.__factid__ = self.ids[row]
+        return fact
+
+    def get(self, idx):
+        """Return the fact `idx`. Raise `KeyError` if not stored."""
+        row = self._get_row(idx)
+        try:
+            return self.views[idx]
+        except KeyError:
+            fact = self.views[idx] = self._build(row)
+            return fact
+
+    def facts(self):
+        """Return the stored facts, in order."""
+        return [self.get(idx) for idx in self]
+
+    def column(self, name):
+        """
+        Return a copy of the values of the field `name` of the stored
+        facts, in order: an `array` if all of them are set and fit in
+        one, otherwise a `list` with `UNSET` for the unset ones.
+
+        """
+        self.compact()
+        return self._get_cells(self.fields.index(name))[:]
+
+    def find(self, values):
+        """
+        Return the stored facts with the given `values` (already frozen),
+        in order, scanning only the columns of their fields.
+
+        """
+        rows = compress(range(len(self.ids)), self.alive)
+        for name, value in values.items():
+            try:
+                column = self._get_cells(self.fields.index(name))
+            except ValueError:
+                return []
+
+            default = self.fact_class.__fields__[name].default
+            if default is Field.NODEFAULT:
+                rows = [row for row in rows if column[row] == value]
+            else:
+                # The unset fields take the default of each fact.
+                rows = [row for row in rows
+                        if column[row] == value
+                        or (column[row] is UNSET
+                            and self.get(self.ids[row])[name] == value)]
+
+        return [self.get(self.ids[row]) for row in rows]
@@ -12,6 +12,8 @@ class ConditionalElement(tuple):
 
 
 class OperableCE:
+    __slots__ = ()
+
     def __and__(self, other):
         if isinstance(self, AND) and isinstance(other, AND):
             return AND(*[x for x in chain(self, other)])
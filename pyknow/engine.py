@@ -9,7 +9,6 @@ import logging
 
 from pyknow import abstract
 
-from pyknow.agenda import Agenda
 from pyknow.fact import InitialFact
 from pyknow.factlist import FactList
 from pyknow.rule import Rule
@@ -35,7 +34,6 @@ class KnowledgeEngine:
     def __init__(self):
         self.running = False
         self.facts = FactList()
-        self.agenda = Agenda()
 
         if (isinstance(self.__matcher__, type)
                 and issubclass(self.__matcher__, abstract.Matcher)):
@@ -49,6 +47,8 @@ class KnowledgeEngine:
         else:
             raise TypeError("__strategy__ must be a subclass of Strategy")
 
+        self.agenda = self.strategy.new_agenda()
+
     @staticmethod
     def _get_real_modifiers(**modifiers):
         for k, v in modifiers.items():
@@ -74,14 +74,85 @@ class KnowledgeEngine:
 
             >>> ke.modify(my_fact, _0="hello", _1="world", other_key="!")
 
+        Facts of classes with `__slot_specific__` set to `True` are
+        changed in place instead, keeping their id. Only the patterns
+        testing the modified keys see the change, so the rules not
+        testing them keep their matches and activations. If the new
+        contents duplicate an existing fact the default behavior is
+        used.
+
         """
-        self.retract(declared_fact)
+        changes = dict(self._get_real_modifiers(**modifiers))
 
         newfact = declared_fact.copy()
-        newfact.update(dict(self._get_real_modifiers(**modifiers)))
+        newfact.update(changes)
+
+        if newfact.__key_fields__:
+            other = self.facts.get_by_key(newfact)
+            if other is not None and other is not declared_fact:
+                raise ValueError(
+                    "A fact with the same key is already declared.")
+
+        if type(declared_fact).__slot_specific__:
+            changes = {k: v for k, v in newfact.items()
+                       if k not in declared_fact
+                       or declared_fact[k] != v}
+            if not changes:
+                return declared_fact
+            elif (self.facts.allows_duplicates(newfact.__class__)
+                  or not self.facts.is_declared(newfact)):
+                newfact.validate()
+                return self.__modify_in_place(declared_fact, changes)
+
+        self.retract(declared_fact)
 
         return self.declare(newfact)
 
+    def __modify_in_place(self, fact, changes):
+        """Change `fact` in place, see `modify`."""
+        if self.facts.get(fact.__factid__) is not fact:
+            raise IndexError('Fact not found.')
+
+        # The network must see the current contents of the fact.
+        added, removed = self.get_activations()
+        self.strategy.update_agenda(self.agenda, added, removed)
+
+        steps = self.matcher.modify(
+            fact,
+            changes,
+            lambda: self.facts.modify(fact, changes))
+
+        for added, removed in steps:
+            self.strategy.update_agenda(self.agenda, added, removed)
+
+        return fact
+
+    def upsert(self, fact):
+        """
+        Declare `fact` replacing the declared fact with the same key.
+
+        The class of `fact` must have key fields (declared with
+        ``Field(..., key=True)``). The declared fact with the same key,
+        if any, is found through the index of the `FactList` and
+        retracted, and `fact` is declared in the same step. If both
+        facts have the same contents nothing is changed.
+
+        `fact` is checked before retracting the declared fact, so
+        nothing is changed if it can't be declared.
+
+        :return: The declared fact.
+        """
+        self.__check_declarable(fact)
+        fact.validate()
+
+        existing = self.facts.get_by_key(fact)
+        if existing is not None:
+            if self.facts.same_contents(existing, fact):
+                return existing
+            self.facts.retract(existing)
+
+        return self.__declare(fact, validated=True)
+
     def duplicate(self, template_fact, **modifiers):
         """Create a new fact from an existing one."""
 
@@ -162,11 +233,7 @@ class KnowledgeEngine:
                     activation.rule.__name__,
                     ", ".join(str(f) for f in activation.facts))
 
-                activation.rule(
-                    self,
-                    **{k: v
-                       for k, v in activation.context.items()
-                       if not k.startswith('__')})
+                activation.rule(self, **activation.get_kwargs())
 
         self.running = False
 
@@ -185,7 +252,7 @@ class KnowledgeEngine:
                   re-declared.
         """
 
-        self.agenda = Agenda()
+        self.agenda = self.strategy.new_agenda()
         self.facts = FactList()
 
         self.matcher.reset()
@@ -209,26 +276,42 @@ class KnowledgeEngine:
 
         self.running = False
 
-    def __declare(self, *facts):
-        """
-        Internal declaration method. Used for ``declare`` and ``deffacts``
-        """
+    @staticmethod
+    def __check_declarable(*facts):
+        """Raise if any of `facts` can't be declared."""
         if any(f.has_field_constraints() for f in facts):
             raise TypeError(
                 "Declared facts cannot contain conditional elements")
         elif any(f.has_nested_accessor() for f in facts):
             raise KeyError(
                 "Cannot declare facts containing double underscores as keys.")
-        else:
-            last_inserted = None
+
+    def __declare(self, *facts, validated=False):
+        """
+        Internal declaration method. Used for ``declare`` and ``deffacts``
+
+        With `validated` the facts are not checked again.
+        """
+        if not validated:
+            self.__check_declarable(*facts)
+
+            batches = dict()
             for fact in facts:
-                last_inserted = self.facts.declare(fact)
+                if fact.__batch_validate__:
+                    batches.setdefault(fact.__class__, []).append(fact)
+            for fact_class, batch in batches.items():
+                fact_class.validate_batch(batch)
 
-            if not self.running:
-                added, removed = self.get_activations()
-                self.strategy.update_agenda(self.agenda, added, removed)
+        last_inserted = None
+        for fact in facts:
+            last_inserted = self.facts.declare(
+                fact, validate=not (validated or fact.__batch_validate__))
+
+        if not self.running:
+            added, removed = self.get_activations()
+            self.strategy.update_agenda(self.agenda, added, removed)
 
-            return last_inserted
+        return last_inserted
 
     def declare(self, *facts):
         """
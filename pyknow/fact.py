@@ -2,15 +2,22 @@ from itertools import chain
 from functools import lru_cache
 import abc
 import collections
+import types
 
 from schema import Schema
 
 from pyknow.pattern import Bindable
 from pyknow.utils import freeze, unfreeze
+from pyknow.validation import compile_schema
 from pyknow.conditionalelement import OperableCE
 from pyknow.conditionalelement import ConditionalElement
 
 
+#: Types of the values `freeze` returns unchanged, checked first to skip
+#: its dispatch.
+SCALARS = frozenset({int, float, bool, str, bytes, type(None)})
+
+
 class BaseField(metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def validate(self, data):
@@ -19,16 +26,37 @@ class BaseField(metaclass=abc.ABCMeta):
 
 
 class Field(BaseField):
+    """
+    Field of a `Fact` subclass validated with a `Schema`.
+
+    Fields declared with `key=True` are the key of the facts of the
+    class: the `FactList` indexes the declared facts by their values. Key
+    fields are mandatory.
+
+    Fields declared with `index=True` are indexed by the `FactList` to
+    speed up `FactList.query`.
+
+    Common schemas are compiled to plain checks (see
+    `pyknow.validation.compile_schema`); `Schema` only runs for the rest
+    and to report the errors.
+
+    """
 
     NODEFAULT = object()
 
-    def __init__(self, schema_definition, mandatory=False, default=NODEFAULT):
+    def __init__(self, schema_definition, mandatory=False, default=NODEFAULT,
+                 key=False, index=False):
+        self.schema_definition = schema_definition
         self.validator = Schema(schema_definition)
-        self.mandatory = mandatory
+        self.check = compile_schema(schema_definition)
+        self.mandatory = mandatory or key
         self.default = default
+        self.key = key
+        self.index = index
 
     def validate(self, data):
-        self.validator.validate(unfreeze(data))
+        if self.check is None or not self.check(data):
+            self.validator.validate(unfreeze(data))
 
 
 class Validable(type):
@@ -47,15 +75,84 @@ class Validable(type):
             else:
                 newnamespace[key] = value
 
-        return super(Validable, mcl).__new__(mcl, name, bases, newnamespace)
+        newnamespace["__key_fields__"] = tuple(
+            key for key, value in newnamespace["__fields__"].items()
+            if getattr(value, 'key', False))
+        newnamespace["__index_fields__"] = tuple(
+            key for key, value in newnamespace["__fields__"].items()
+            if getattr(value, 'index', False))
+
+        template = any(getattr(base, '__template__', False)
+                       for base in bases)
+        if template and '__slots__' not in nmspc:
+            newnamespace["__slots__"] = tuple(
+                mcl._get_new_slots(name, bases, newnamespace["__fields__"]))
+
+        cls = super(Validable, mcl).__new__(mcl, name, bases, newnamespace)
+
+        if template:
+            cls.__field_slots__ = {key: mcl._get_slot(cls, key)
+                                   for key in cls.__fields__}
+
+        return cls
+
+    @staticmethod
+    def _get_new_slots(name, bases, fields):
+        """
+        Yield the slots of the `fields` of a template not already
+        defined by its bases (the fields can come from any `Fact`).
+
+        """
+        for key in fields:
+            inherited = [getattr(base, key) for base in bases
+                         if hasattr(base, key)]
+            if not inherited:
+                yield key
+            elif not all(isinstance(attr, types.MemberDescriptorType)
+                         for attr in inherited):
+                raise TypeError(
+                    "Field %r of template %s clashes with a Fact attribute"
+                    % (key, name))
+
+    @staticmethod
+    def _get_slot(cls, key):
+        """Return the slot of the field `key` of the template `cls`."""
+        for klass in cls.__mro__:
+            attr = vars(klass).get(key)
+            if isinstance(attr, types.MemberDescriptorType):
+                return attr
+        raise TypeError(
+            "Field %r of template %s has no slot" % (key, cls.__name__))
 
 
 class Fact(OperableCE, Bindable, dict, metaclass=Validable):
     """Base Fact class"""
 
+    #: When `True` patterns of this class also match facts of any
+    #: subclass.
+    __match_subclasses__ = False
+
+    #: When `True`, `KnowledgeEngine.modify` changes the facts of this
+    #: class in place and only the patterns testing the modified keys
+    #: see the change.
+    __slot_specific__ = False
+
+    #: When `True`, `KnowledgeEngine.declare` validates together all the
+    #: facts of this class passed in the same call (see
+    #: `validate_batch`), before declaring any of them.
+    __batch_validate__ = False
+
+    #: Whether duplicated facts of this class can be declared. `None`
+    #: follows `FactList.duplication`; when `True` the `FactList` doesn't
+    #: keep the digests of these facts.
+    __duplication__ = None
+
+    __slots__ = ('_defaults', '_hash', '_digest', '__weakref__')
+
     def __init__(self, *args, **kwargs):
+        self._digest = None
         self.update(dict(chain(enumerate(args), kwargs.items())))
-        self.__defaults = dict()
+        self._defaults = dict()
 
     def __missing__(self, key):
         if key not in self.__fields__:
@@ -64,19 +161,42 @@ class Fact(OperableCE, Bindable, dict, metaclass=Validable):
             default = self.__fields__[key].default
             if default is Field.NODEFAULT:
                 raise KeyError(key)
-            elif key in self.__defaults:
-                return self.__defaults[key]
+            elif key in self._defaults:
+                return self._defaults[key]
             elif isinstance(default, collections.abc.Callable):
-                return self.__defaults.setdefault(key, default())
+                return self._defaults.setdefault(key, default())
             else:
-                return self.__defaults.setdefault(key, default)
+                return self._defaults.setdefault(key, default)
 
     def __setitem__(self, key, value):
         if self.__factid__ is None:
             super().__setitem__(key, freeze(value))
+            self._digest = None
         else:
             raise RuntimeError("A fact can't be modified after declaration.")
 
+    def _setitem(self, key, value):
+        """Set `key` skipping the inmutability check (see `FactList`)."""
+        dict.__setitem__(self, key, freeze(value))
+        self._digest = None
+
+    @property
+    def __digest__(self):
+        """
+        Hash of the class and the contents (without the special keys) of
+        the fact, used by the `FactList` to find duplicated facts.
+
+        It is computed once and kept until the fact is changed.
+
+        """
+        digest = self._digest
+        if digest is None:
+            digest = self._digest = hash(
+                (self.__class__,
+                 frozenset((k, v) for k, v in self.items()
+                           if not self.is_special(k))))
+        return digest
+
     def validate(self):
         for name, field in self.__fields__.items():
             if name in self:
@@ -93,6 +213,41 @@ class Fact(OperableCE, Bindable, dict, metaclass=Validable):
             else:
                 pass
 
+    @classmethod
+    def validate_batch(cls, facts):
+        """
+        Validate `facts`, instances of this class, field by field.
+
+        The values of each field are checked in one pass with the
+        compiled check of the field (see `Field`); the facts are only
+        validated one by one, raising the `ValueError` of `validate`,
+        when any of them is not valid.
+
+        """
+        missing = object()
+        for name, field in cls.__fields__.items():
+            values = [fact.get(name, missing) for fact in facts]
+            present = [value for value in values if value is not missing]
+
+            check = getattr(field, 'check', None)
+            if (check is not None
+                    and (len(present) == len(values) or not field.mandatory)
+                    and all(map(check, present))):
+                continue
+
+            for fact, value in zip(facts, values):
+                if value is not missing:
+                    try:
+                        field.validate(value)
+                    except Exception as exc:
+                        raise ValueError(
+                            "Invalid value on field %r for fact %r"
+                            % (name, fact))
+                elif field.mandatory:
+                    raise ValueError(
+                        "Mandatory field %r is not defined for fact %r"
+                        % (name, fact))
+
     def update(self, mapping):
         for k, v in mapping.items():
             self[k] = v
@@ -175,6 +330,216 @@ class Fact(OperableCE, Bindable, dict, metaclass=Validable):
                 and super().__eq__(other))
 
 
+class FactTemplate(Fact):
+    """
+    Base class for facts whose keys are all declared through `Field`.
+
+    Subclasses are generated as ``__slots__`` classes: the value of each
+    field is kept in its own slot instead of in the dictionary, which
+    makes the facts smaller and faster to build. Positional arguments
+    are assigned to the fields in declaration order and the fields can
+    be read as attributes too::
+
+        >>> class Reading(FactTemplate):
+        ...     sensor = Field(int, key=True)
+        ...     value = Field(float, default=0.0)
+        >>> Reading(3, 20.5).value
+        20.5
+
+    Keys which are not fields are rejected, except the nested accessors
+    of a field (``payload__status``) used in patterns.
+
+    Fields inherited from other `Fact` classes are kept in slots too;
+    those classes must declare ``__slots__ = ()`` for the facts to have
+    no ``__dict__``.
+
+    """
+    __template__ = True
+
+    #: When `True` the `FactList` stores the facts of this class column
+    #: by column (see `pyknow.columnstore.ColumnStore`).
+    __columnar__ = False
+
+    __slots__ = ('__factid__', '__bind__')
+    __field_slots__ = dict()
+
+    def __init__(self, *args, **kwargs):
+        self.__factid__ = None
+        self.__bind__ = None
+        self._defaults = None
+        self._digest = None
+
+        if len(args) > len(self.__fields__):
+            raise TypeError(
+                "%s takes at most %d positional values (%d given)"
+                % (self.__class__.__name__, len(self.__fields__), len(args)))
+
+        slots = self.__field_slots__
+        for key, value in chain(zip(self.__fields__, args), kwargs.items()):
+            slot = slots.get(key)
+            if slot is None:
+                self._setitem(key, value)
+            elif type(value) in SCALARS:
+                slot.__set__(self, value)
+            else:
+                slot.__set__(self, freeze(value))
+
+    def __reduce__(self):
+        # The values are in slots: pickle and copy them as items.
+        return (self.__class__, (), dict(self.items()))
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            self._setitem(key, value)
+
+    def __setitem__(self, key, value):
+        if self.__factid__ is None:
+            self._setitem(key, value)
+        else:
+            raise RuntimeError("A fact can't be modified after declaration.")
+
+    def _setitem(self, key, value):
+        self._digest = None
+        slot = self.__field_slots__.get(key)
+        if slot is not None:
+            slot.__set__(self, value if type(value) in SCALARS
+                         else freeze(value))
+        elif key == '__bind__' or key == '__factid__':
+            setattr(self, key, value)
+        elif (isinstance(key, str)
+                and key.split('__', 1)[0] in self.__field_slots__):
+            # Nested accessor, only useful in patterns.
+            dict.__setitem__(self, key, freeze(value))
+        else:
+            raise KeyError(
+                "%r is not a field of %s" % (key, self.__class__.__name__))
+
+    def __getitem__(self, key):
+        try:
+            slot = self.__field_slots__[key]
+        except KeyError:
+            if key == '__bind__' or key == '__factid__':
+                value = getattr(self, key)
+                if value is None:
+                    raise
+                return value
+            return dict.__getitem__(self, key)
+
+        try:
+            return slot.__get__(self)
+        except AttributeError:
+            return self.__missing__(key)
+
+    def __missing__(self, key):
+        if key not in self.__fields__:
+            raise KeyError(key)
+
+        default = self.__fields__[key].default
+        if default is Field.NODEFAULT:
+            raise KeyError(key)
+
+        if self._defaults is None:
+            self._defaults = dict()
+        elif key in self._defaults:
+            return self._defaults[key]
+
+        if isinstance(default, collections.abc.Callable):
+            default = default()
+        return self._defaults.setdefault(key, default)
+
+    def __getattr__(self, name):
+        # Only called for the unset slots: return the field defaults.
+        if name in self.__field_slots__:
+            try:
+                return self.__missing__(name)
+            except KeyError:
+                pass
+        raise AttributeError(
+            "%r object has no attribute %r" % (self.__class__.__name__, name))
+
+    def __contains__(self, key):
+        slot = self.__field_slots__.get(key)
+        if slot is not None:
+            try:
+                slot.__get__(self)
+            except AttributeError:
+                return False
+            else:
+                return True
+        elif key == '__bind__' or key == '__factid__':
+            return getattr(self, key) is not None
+        else:
+            return dict.__contains__(self, key)
+
+    def validate(self):
+        for name, field in self.__fields__.items():
+            try:
+                value = self.__field_slots__[name].__get__(self)
+            except AttributeError:
+                if field.mandatory:
+                    raise ValueError(
+                        "Mandatory field %r is not defined for fact %r"
+                        % (name, self))
+            else:
+                try:
+                    field.validate(value)
+                except Exception as exc:
+                    raise ValueError(
+                        "Invalid value on field %r for fact %r"
+                        % (name, self))
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        else:
+            return default
+
+    def _content_items(self):
+        """Return the items of the fields and nested accessors."""
+        items = []
+        for key, slot in self.__field_slots__.items():
+            try:
+                items.append((key, slot.__get__(self)))
+            except AttributeError:
+                pass
+        items.extend(dict.items(self))
+        return items
+
+    @property
+    def __digest__(self):
+        digest = self._digest
+        if digest is None:
+            digest = self._digest = hash(
+                (self.__class__, frozenset(self._content_items())))
+        return digest
+
+    def items(self):
+        items = self._content_items()
+        if self.__bind__ is not None:
+            items.append(('__bind__', self.__bind__))
+        if self.__factid__ is not None:
+            items.append(('__factid__', self.__factid__))
+        return items
+
+    def keys(self):
+        return [key for key, _ in self.items()]
+
+    def values(self):
+        return [value for _, value in self.items()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.items())
+
+    __hash__ = Fact.__hash__
+
+    def __eq__(self, other):
+        return (self.__class__ == other.__class__
+                and dict(self.items()) == dict(other.items()))
+
+
 class InitialFact(Fact):
     """
     InitialFact
@@ -9,8 +9,12 @@ Also see `retrieving the fact-list \
           programming manual
 """
 
-from collections import OrderedDict, Counter
+from collections import OrderedDict
+from heapq import merge
+
+from pyknow.columnstore import ColumnStore
 from pyknow.fact import Fact
+from pyknow.utils import freeze
 from pyknow import watchers
 
 
@@ -25,12 +29,31 @@ class FactList(OrderedDict):
     A factlist acts as both the module's factlist and a ``fact-set``
     yet currently most methods from a ``fact-set`` are not yet
     implemented
+
+    Duplicated facts are detected with the `__digest__` of the facts,
+    kept in `contents`, unless duplicates are allowed: for every class
+    when `duplication` is `True`, or per class with `__duplication__`.
+
+    The ids of the facts of each class are kept in `type_index` and, for
+    the indexed fields, in `indexes` by value; the facts themselves are
+    only referenced by the list.
+
+    The facts of the `FactTemplate` classes with `__columnar__` set to
+    `True` are kept in a `ColumnStore` per class (in `column_stores`)
+    instead of in the dictionary, and they are only built again when
+    needed.
     """
 
     def __init__(self):
         super().__init__()
         self.last_index = 0
-        self.reference_counter = Counter()
+        self.contents = dict()
+        self.key_index = dict()
+        self.type_index = dict()
+        self.indexes = dict()
+        self.index_specs = list()
+        self._index_fields = dict()
+        self.column_stores = dict()
         self.added = list()
         self.removed = list()
         self.duplication = False
@@ -40,14 +63,297 @@ class FactList(OrderedDict):
             "%s: %r" % (fact, fact)
             for idx, fact in self.items())
 
+    def __getitem__(self, idx):
+        try:
+            return super().__getitem__(idx)
+        except KeyError:
+            for store in self.column_stores.values():
+                if idx in store:
+                    return store.get(idx)
+            raise
+
+    def get(self, idx, default=None):
+        try:
+            return self[idx]
+        except KeyError:
+            return default
+
+    def __contains__(self, idx):
+        return (super().__contains__(idx)
+                or any(idx in store for store in self.column_stores.values()))
+
+    def __len__(self):
+        return super().__len__() + sum(
+            len(store) for store in self.column_stores.values())
+
+    def __iter__(self):
+        if self.column_stores:
+            return merge(super().__iter__(), *self.column_stores.values())
+        else:
+            return super().__iter__()
+
+    def keys(self):
+        if self.column_stores:
+            return list(self)
+        else:
+            return super().keys()
+
+    def values(self):
+        if self.column_stores:
+            return [self[idx] for idx in self]
+        else:
+            return super().values()
+
+    def items(self):
+        if self.column_stores:
+            return [(idx, self[idx]) for idx in self]
+        else:
+            return super().items()
+
+    def _get_store(self, fact_class):
+        """Return the `ColumnStore` of `fact_class`, if it has one."""
+        if not getattr(fact_class, '__columnar__', False):
+            return None
+        try:
+            return self.column_stores[fact_class]
+        except KeyError:
+            store = self.column_stores[fact_class] = ColumnStore(fact_class)
+            return store
+
     @staticmethod
-    def _get_fact_id(fact):
-        return frozenset([fact.__class__]
-                         + [(k, v)
-                            for k, v in fact.items()
-                            if not fact.is_special(k)])
+    def same_contents(fact, other):
+        """Return True if both facts have the same class and contents."""
+        if fact.__class__ is not other.__class__:
+            return False
+        return ({k: v for k, v in fact.items() if not fact.is_special(k)}
+                == {k: v for k, v in other.items() if not other.is_special(k)})
+
+    def allows_duplicates(self, fact_class):
+        """
+        Return True if duplicated facts of `fact_class` can be declared:
+        if its `__duplication__` is `True`, or `None` and `duplication` is
+        `True`.
+
+        """
+        duplication = fact_class.__duplication__
+        if duplication is None:
+            return self.duplication
+        else:
+            return duplication
+
+    def _add_contents(self, fact):
+        idx = fact.__factid__
+        digest = fact.__digest__
+        entry = self.contents.get(digest)
+        if entry is None:
+            self.contents[digest] = idx
+        elif isinstance(entry, list):
+            entry.append(idx)
+        else:
+            self.contents[digest] = [entry, idx]
+
+    def _remove_contents(self, fact):
+        idx = fact.__factid__
+        digest = fact.__digest__
+        entry = self.contents[digest]
+        if isinstance(entry, list):
+            entry.remove(idx)
+            if len(entry) == 1:
+                self.contents[digest] = entry[0]
+        else:
+            del self.contents[digest]
+
+    def _find_declared(self, fact):
+        """Return a declared fact with the same contents as `fact`."""
+        if fact.__duplication__ is True:
+            # The contents of these facts are not kept.
+            for other in self.of_type(fact.__class__):
+                if self.same_contents(fact, other):
+                    return other
+            return None
+
+        entry = self.contents.get(fact.__digest__)
+        if entry is None:
+            return None
+
+        for idx in entry if isinstance(entry, list) else (entry, ):
+            other = self[idx]
+            if self.same_contents(fact, other):
+                return other
+        return None
+
+    @staticmethod
+    def _get_key(fact):
+        """
+        Return the index key of `fact`: its class and the values of its
+        key fields, or `None` if the class has no key fields.
+
+        """
+        fields = fact.__key_fields__
+        if not fields:
+            return None
+
+        try:
+            return (fact.__class__,
+                    tuple(freeze(fact[name]) for name in fields))
+        except KeyError as exc:
+            raise ValueError(
+                "Key field %s is not defined for fact %r" % (exc, fact))
+
+    def get_by_key(self, fact):
+        """
+        Return the declared fact with the same key as `fact`.
+
+        `fact` can be any fact of the same class with the key fields
+        defined, for example ``Sensor(id=3)``.
+
+        :return: The declared fact or `None` if there is no one.
+        :throws TypeError: If the class of `fact` has no key fields.
+        """
+        key = self._get_key(fact)
+        if key is None:
+            raise TypeError(
+                "%s has no key fields." % fact.__class__.__name__)
+
+        try:
+            return self[self.key_index[key]]
+        except KeyError:
+            return None
+
+    def _get_index_fields(self, fact_class):
+        """Return the fields indexed for the facts of `fact_class`."""
+        try:
+            return self._index_fields[fact_class]
+        except KeyError:
+            fields = list(fact_class.__index_fields__)
+            for cls, field in self.index_specs:
+                if issubclass(fact_class, cls) and field not in fields:
+                    fields.append(field)
+            self._index_fields[fact_class] = tuple(fields)
+            return self._index_fields[fact_class]
+
+    def _index_fact(self, fact, fields=None):
+        """Add `fact` to the type index and the indexes of `fields`."""
+        idx = fact.__factid__
+        fact_class = fact.__class__
+
+        if fields is None:
+            self.type_index.setdefault(fact_class, dict())[idx] = None
+            fields = self._get_index_fields(fact_class)
+
+        for field in fields:
+            try:
+                value = freeze(fact[field])
+            except KeyError:
+                continue
+            index = self.indexes.setdefault((fact_class, field), dict())
+            index.setdefault(value, dict())[idx] = None
+
+    def _unindex_fact(self, fact):
+        """Remove `fact` from the type index and the field indexes."""
+        idx = fact.__factid__
+        fact_class = fact.__class__
+
+        ids = self.type_index[fact_class]
+        del ids[idx]
+        if not ids:
+            del self.type_index[fact_class]
+
+        for field in self._get_index_fields(fact_class):
+            try:
+                value = freeze(fact[field])
+            except KeyError:
+                continue
+            index = self.indexes[(fact_class, field)]
+            bucket = index[value]
+            del bucket[idx]
+            if not bucket:
+                del index[value]
+
+    def add_index(self, fact_class, field):
+        """
+        Index by `field` the facts of `fact_class` (and its subclasses).
+
+        The index is built for the facts already declared and updated by
+        `declare`, `retract` and `modify`; `query` uses it. Fields
+        declared with ``Field(..., index=True)`` are always indexed;
+        indexes added with this method belong to this fact-list, so
+        they must be added again after `KnowledgeEngine.reset`.
+
+        """
+        if (fact_class, field) in self.index_specs:
+            return
+
+        self.index_specs.append((fact_class, field))
+        self._index_fields.clear()
+
+        for cls, ids in self.type_index.items():
+            if (issubclass(cls, fact_class)
+                    and (cls, field) not in self.indexes):
+                self.indexes[(cls, field)] = dict()
+                for idx in ids:
+                    self._index_fact(self[idx], fields=(field, ))
+
+    def of_type(self, fact_class):
+        """
+        Return the declared facts of `fact_class` or any of its
+        subclasses, in declaration order.
+
+        """
+        result = [self[idx]
+                  for cls, ids in self.type_index.items()
+                  if issubclass(cls, fact_class)
+                  for idx in ids]
+        for cls, store in self.column_stores.items():
+            if issubclass(cls, fact_class):
+                result.extend(store.facts())
+
+        return sorted(result, key=lambda fact: fact.__factid__)
 
-    def declare(self, fact):
+    def query(self, fact_class, **values):
+        """
+        Return the declared facts of `fact_class` (or any of its
+        subclasses) with the given `values`, in declaration order.
+
+        If any of the fields is indexed (see `add_index`) only the facts
+        in the smallest index entry are tested, otherwise all the facts
+        of the class are. The facts stored by column are found scanning
+        the columns of the fields, which are not indexed.
+
+        Example::
+
+            >>> engine.facts.query(Order, status='open')
+
+        """
+        values = {field: freeze(value) for field, value in values.items()}
+
+        def _matches(fact):
+            try:
+                return all(fact[field] == value
+                           for field, value in values.items())
+            except KeyError:
+                return False
+
+        result = list()
+        for cls, candidates in self.type_index.items():
+            if not issubclass(cls, fact_class):
+                continue
+            for field, value in values.items():
+                index = self.indexes.get((cls, field))
+                if index is not None:
+                    entry = index.get(value, {})
+                    if len(entry) < len(candidates):
+                        candidates = entry
+            result.extend(fact for fact in map(self.__getitem__, candidates)
+                          if _matches(fact))
+
+        for cls, store in self.column_stores.items():
+            if issubclass(cls, fact_class):
+                result.extend(store.find(values))
+
+        return sorted(result, key=lambda fact: fact.__factid__)
+
+    def declare(self, fact, validate=True):
         """
         Assert (in clips terminology) a fact.
 
@@ -58,8 +364,11 @@ class FactList(OrderedDict):
 
         :param fact: The fact to declare, **must** be derived from
                      :obj:`pyknow.fact.Fact`.
+        :param validate: Whether to validate the fact; `False` if it was
+                         already validated.
         :return: (int) The index of the fact in the list.
-        :throws ValueError: If the fact providen is not a Fact object
+        :throws ValueError: If the fact providen is not a Fact object or
+                            a fact with the same key is already declared.
 
         """
 
@@ -67,22 +376,35 @@ class FactList(OrderedDict):
             raise ValueError('The fact must descend the Fact class.')
 
         # Validate fact, will raise on validation error.
-        fact.validate()
-
-        fact_id = self._get_fact_id(fact)
+        if validate:
+            fact.validate()
+
+        if (self.allows_duplicates(fact.__class__)
+                or self._find_declared(fact) is None):
+            key = self._get_key(fact)
+            if key is not None:
+                if key in self.key_index:
+                    raise ValueError(
+                        "A fact with the same key is already declared.")
+                self.key_index[key] = self.last_index
 
-        if self.duplication or fact_id not in self.reference_counter:
             # Assign the ID to the fact
             idx = self.last_index
             fact.__factid__ = idx
 
             # Insert the fact in the factlist
-            self[idx] = fact
+            store = self._get_store(fact.__class__)
+            if store is None:
+                self[idx] = fact
+                self._index_fact(fact)
+            else:
+                store.append(fact)
 
             self.last_index += 1
 
             self.added.append(fact)
-            self.reference_counter[fact_id] += 1
+            if fact.__duplication__ is not True:
+                self._add_contents(fact)
 
             watchers.FACTS.info(" ==> %s: %r", fact, fact)
             return fact
@@ -112,19 +434,84 @@ class FactList(OrderedDict):
 
         fact = self[idx]
 
-        # Decrement value reference counter
-        fact_id = self._get_fact_id(fact)
-        self.reference_counter[fact_id] -= 1
-        if self.reference_counter[fact_id] == 0:
-            self.reference_counter.pop(fact_id)
+        if fact.__duplication__ is not True:
+            self._remove_contents(fact)
+
+        key = self._get_key(fact)
+        if key is not None and self.key_index.get(key) == idx:
+            del self.key_index[key]
 
         watchers.FACTS.info(" <== %s: %r", fact, fact)
         self.removed.append(fact)
 
-        del self[idx]
+        store = self._get_store(fact.__class__)
+        if store is None:
+            self._unindex_fact(fact)
+            del self[idx]
+        else:
+            store.remove(idx)
 
         return idx
 
+    def is_declared(self, fact):
+        """Return True if a fact with the same contents is declared."""
+        return self._find_declared(fact) is not None
+
+    def modify(self, fact, changes):
+        """
+        Change in place the values of a declared fact, keeping its id.
+
+        The new values must have been validated already. The change is
+        not recorded in `changes`: propagating it is up to the caller
+        (see `KnowledgeEngine.modify`).
+
+        :param fact: The declared fact to modify.
+        :param changes: Mapping of keys to the new values.
+        :return: The modified fact.
+        :throws IndexError: If the fact is not declared.
+        :throws ValueError: If other fact with the new key is declared.
+        """
+        if self.get(fact.__factid__) is not fact:
+            raise IndexError('Fact not found.')
+
+        old_key = self._get_key(fact)
+        if old_key is not None:
+            new_key = (old_key[0],
+                       tuple(freeze(changes[name]) if name in changes
+                             else value
+                             for name, value in zip(fact.__key_fields__,
+                                                    old_key[1])))
+            if self.key_index.get(new_key, fact.__factid__) \
+                    != fact.__factid__:
+                raise ValueError(
+                    "A fact with the same key is already declared.")
+            del self.key_index[old_key]
+            self.key_index[new_key] = fact.__factid__
+
+        tracked = fact.__duplication__ is not True
+        if tracked:
+            self._remove_contents(fact)
+
+        store = self._get_store(fact.__class__)
+        if store is None:
+            self._unindex_fact(fact)
+
+        # Skip the inmutability check of `Fact.__setitem__`. The hash of
+        # the fact (cached on its first use) is kept; the network stores
+        # the fact in sets, and the id keeps it different from the rest.
+        for key, value in changes.items():
+            fact._setitem(key, value)
+
+        if tracked:
+            self._add_contents(fact)
+        if store is None:
+            self._index_fact(fact)
+        else:
+            store.update(fact)
+
+        watchers.FACTS.info(" <=> %s: %r", fact, fact)
+        return fact
+
     @property
     def changes(self):
         """
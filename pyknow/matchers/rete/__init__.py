@@ -14,6 +14,8 @@ from collections import Counter
 
 from .check import TypeCheck, FactCapture, FeatureCheck
 from .nodes import BusNode, ConflictSetNode, FeatureTesterNode
+from .nodes import FeatureSwitchNode
+from .token import Token
 from .utils import prepare_rule, extract_facts, generate_checks, wire_rule
 from pyknow import OR
 from pyknow.rule import Rule
@@ -28,6 +30,7 @@ class ReteMatcher(Matcher):
         """Create the RETE network for `self.engine`."""
         super().__init__(*args, **kwargs)
         self.root_node = BusNode()
+        self.dirty_nodes = None
         self.build_network()
 
     @lru_cache(maxsize=1)
@@ -46,26 +49,112 @@ class ReteMatcher(Matcher):
 
         return tuple(nodes)
 
-    def changes(self, adding=None, deleting=None):
-        """Pass the given changes to the root_node."""
-        if deleting is not None:
-            for deleted in deleting:
-                self.root_node.remove(deleted)
-
-        if adding is not None:
-            for added in adding:
-                self.root_node.add(added)
+    def _track_dirty_nodes(self):
+        """Make the conflict set nodes register their changes."""
+        if self.dirty_nodes is None:
+            self.dirty_nodes = dict()
+            for csn in self._get_conflict_set_nodes():
+                csn.dirty = self.dirty_nodes
 
+    def _collect_activations(self):
+        """Return the activation changes of the dirty nodes."""
         added = list()
         removed = list()
 
-        for csn in self._get_conflict_set_nodes():
+        for csn in self.dirty_nodes:
             c_added, c_removed = csn.get_activations()
             added.extend(c_added)
             removed.extend(c_removed)
+        self.dirty_nodes.clear()
 
         return (added, removed)
 
+    def changes(self, adding=None, deleting=None):
+        """
+        Pass the given changes to the root_node.
+
+        The changes are propagated set-at-a-time: every node receives at
+        once all the tokens produced by its parent for these changes.
+
+        Only the conflict set nodes modified since the last call (the
+        `dirty_nodes`) are asked for their activations.
+
+        """
+        self._track_dirty_nodes()
+
+        if deleting is not None:
+            self.root_node.remove_batch(deleting)
+
+        if adding is not None:
+            self.root_node.add_batch(adding)
+
+        return self._collect_activations()
+
+    @staticmethod
+    def _tests_keys(node, keys):
+        """Return True if the alpha `node` tests any of the `keys`."""
+        if isinstance(node, FeatureSwitchNode):
+            what = node.what
+        else:
+            what = getattr(getattr(node, 'matcher', None), 'what', None)
+
+        if isinstance(what, str):
+            # Nested accessors depend on their first key.
+            return what.split('__', 1)[0] in keys or what in keys
+        else:
+            return what is not None and what in keys
+
+    def _get_reacting_children(self, token, keys):
+        """
+        Follow `token` through the alpha network and return the first
+        nodes (as `(child, token)` pairs) testing any of the `keys`.
+
+        """
+        def _walk(children, token):
+            for child in children:
+                node = child.node
+                if self._tests_keys(node, keys):
+                    yield (child, token)
+                elif isinstance(node, FeatureTesterNode):
+                    passed = node._test(token)
+                    if passed is not None:
+                        yield from _walk(node.children, passed)
+                elif isinstance(node, FeatureSwitchNode):
+                    yield from _walk(node._get_branch(token), token)
+
+        fact = next(iter(token.data))
+        return list(_walk(self.root_node.get_children(type(fact)), token))
+
+    def modify(self, fact, keys, update):
+        """
+        Propagate an in place change of the values of `keys` of `fact`.
+
+        An INVALID token is sent only through the alpha branches testing
+        any of the `keys`; then `update` is called to change the fact
+        and a VALID token follows the same way. The partial matches and
+        activations of the patterns not testing the `keys` are kept.
+
+        Return a list with the activation changes (a pair of added and
+        removed activations) of each step.
+
+        """
+        self._track_dirty_nodes()
+        keys = frozenset(keys)
+
+        for child, token in self._get_reacting_children(Token.invalid(fact),
+                                                        keys):
+            child.callback(token)
+        retracted = self._collect_activations()
+
+        update()
+
+        for child, token in self._get_reacting_children(Token.valid(fact),
+                                                        keys):
+            child.callback(token)
+        declared = self._collect_activations()
+
+        return [retracted, declared]
+
     def build_network(self):
         ruleset = self.prepare_ruleset(self.engine)
         alpha_terminals = self.build_alpha_part(ruleset, self.root_node)
@@ -156,10 +245,39 @@ class ReteMatcher(Matcher):
 
                 fact_terminal_nodes[fact] = current_node
 
+        ReteMatcher.build_alpha_switches(root_node)
+
         # Return this dictionary containing the last alpha node for each
         # fact.
         return fact_terminal_nodes
 
+    @staticmethod
+    def build_alpha_switches(node):
+        """
+        Group sibling literal tests over the same feature behind a
+        `FeatureSwitchNode`, recursively from `node`.
+
+        """
+        if not isinstance(node, FeatureSwitchNode):
+            literals = dict()
+            for child in node.children:
+                if (isinstance(child.node, FeatureTesterNode)
+                        and FeatureSwitchNode.can_dispatch(
+                            child.node.matcher)):
+                    what = child.node.matcher.what
+                    literals.setdefault(what, list()).append(child)
+
+            for what, children in literals.items():
+                if len(children) > 1:
+                    switch = FeatureSwitchNode(what)
+                    for child in children:
+                        node.children.remove(child)
+                        switch.add_child(child.node, child.callback)
+                    node.add_child(switch, switch.activate)
+
+        for child in node.children:
+            ReteMatcher.build_alpha_switches(child.node)
+
     @staticmethod
     def build_beta_part(ruleset, alpha_terminals):
         """
@@ -167,13 +285,19 @@ class ReteMatcher(Matcher):
         patterns and alpha_nodes, wire up the beta part of the RETE
         network.
 
+        Beta nodes with the same inputs and tests are shared between
+        rules.
+
         """
+        shared_nodes = dict()
         for rule in ruleset:
             if isinstance(rule[0], OR):
                 for subrule in rule[0]:
-                    wire_rule(rule, alpha_terminals, lhs=subrule)
+                    wire_rule(rule, alpha_terminals, lhs=subrule,
+                              shared_nodes=shared_nodes)
             else:
-                wire_rule(rule, alpha_terminals, lhs=rule)
+                wire_rule(rule, alpha_terminals, lhs=rule,
+                          shared_nodes=shared_nodes)
 
     def print_network(self):  # pragma: no cover
         """
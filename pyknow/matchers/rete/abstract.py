@@ -17,6 +17,16 @@ class Node(metaclass=abc.ABCMeta):
         """Add a child to `self.children` if necessary."""
         pass
 
+    def add_parent(self, parent, port):
+        """
+        Called when this node is connected as a child of `parent`.
+
+        `port` is the name of the activation method used by `parent`.
+        Nothing to do by default.
+
+        """
+        pass
+
     def reset(self):
         """Reset itself and recursively all its children."""
         watchers.MATCHER.debug("Node <%s> reset", self)
@@ -50,6 +60,19 @@ class OneInputNode(Node):
         """Node activation routine."""
         pass
 
+    def activate_batch(self, tokens):
+        """Activate this node with a list of tokens at once."""
+        if watchers.worth('MATCHER', 'DEBUG'):  # pragma: no cover
+            watchers.MATCHER.debug(
+                "Node <%s> activated with %d tokens", self, len(tokens))
+
+        return self._activate_batch(tokens)
+
+    def _activate_batch(self, tokens):
+        """Node batch activation routine. One token at a time by default."""
+        for token in tokens:
+            self._activate(token)
+
 
 class TwoInputNode(Node):
     """Nodes which have two input ports: left and right."""
@@ -65,6 +88,17 @@ class TwoInputNode(Node):
         """Node left activation routine."""
         pass
 
+    def activate_left_batch(self, tokens):
+        """Activate the left port with a list of tokens at once."""
+        watchers.MATCHER.debug(
+            "Node <%s> activated left with %d tokens", self, len(tokens))
+        return self._activate_left_batch(tokens)
+
+    def _activate_left_batch(self, tokens):
+        """Left batch activation routine. One token at a time by default."""
+        for token in tokens:
+            self._activate_left(token)
+
     def activate_right(self, token):
         """Make a copy of the received token and call `_activate_right`."""
         watchers.MATCHER.debug(
@@ -76,6 +110,17 @@ class TwoInputNode(Node):
         """Node right activation routine."""
         pass
 
+    def activate_right_batch(self, tokens):
+        """Activate the right port with a list of tokens at once."""
+        watchers.MATCHER.debug(
+            "Node <%s> activated right with %d tokens", self, len(tokens))
+        return self._activate_right_batch(tokens)
+
+    def _activate_right_batch(self, tokens):
+        """Right batch activation routine. One token at a time by default."""
+        for token in tokens:
+            self._activate_right(token)
+
     def __str__(self):  # pragma: no cover
         return self.__class__.__name__
 
@@ -4,10 +4,12 @@ from functools import singledispatch
 import dis
 import inspect
 
+from pyknow.fact import Fact
 from pyknow.fieldconstraint import FieldConstraint
 from pyknow.fieldconstraint import L, P, W
 from pyknow.fieldconstraint import ANDFC, ORFC, NOTFC
 from .abstract import Check
+from .token import Context
 from pyknow.watchers import MATCH
 
 
@@ -15,6 +17,27 @@ CheckFunction = namedtuple('CheckFunction',
                            ['key_a', 'key_b', 'expected', 'check'])
 
 
+def get_feature(fact, what):
+    """
+    Return the value of the feature `what` of `fact`.
+
+    String features containing double underscores are resolved as
+    nested accessors (`key__0__subkey`). Raise `IndexError`, `KeyError`
+    or `TypeError` when the feature is not present.
+
+    """
+    if isinstance(what, str):
+        record = fact
+        if not what.startswith('__') and not what.endswith('__'):
+            for p in what.split('__'):
+                if p.isnumeric():
+                    p = int(p)
+                record = record[p]
+        return record
+    else:
+        return fact[what]
+
+
 class TypeCheck(Check, namedtuple('_TypeCheck', ['fact_type'])):
 
     _instances = dict()
@@ -24,8 +47,23 @@ class TypeCheck(Check, namedtuple('_TypeCheck', ['fact_type'])):
             cls._instances[fact_type] = super().__new__(cls, fact_type)
         return cls._instances[fact_type]
 
+    def matches_type(self, fact_type):
+        """
+        Return `True` if facts of type `fact_type` pass this check.
+
+        Only the exact type matches unless the pattern class enables
+        `__match_subclasses__`, in that case any subclass matches too.
+
+        """
+        if fact_type is self.fact_type:
+            return True
+        elif getattr(self.fact_type, '__match_subclasses__', False):
+            return issubclass(fact_type, self.fact_type)
+        else:
+            return False
+
     def __call__(self, fact):
-        res = type(fact) == self.fact_type
+        res = self.matches_type(type(fact))
 
         log = MATCH.info if res else MATCH.debug
         log("type(%s) == %s = %r",
@@ -84,22 +122,10 @@ class FeatureCheck(Check,
 
     def __call__(self, data, is_fact=True):
         if is_fact:
-            if isinstance(self.what, str):
-                record = data
-                if (not self.what.startswith('__')
-                        and not self.what.endswith('__')):
-                    try:
-                        for p in self.what.split('__'):
-                            if p.isnumeric():
-                                p = int(p)
-                            record = record[p]
-                    except (IndexError, KeyError, TypeError):
-                        return False
-            else:
-                try:
-                    record = data[self.what]
-                except (IndexError, KeyError, TypeError):
-                    return False
+            try:
+                record = get_feature(data, self.what)
+            except (IndexError, KeyError, TypeError):
+                return False
         else:
             record = data
 
@@ -232,6 +258,15 @@ class FeatureCheck(Check,
 
 
 class SameContextCheck(Check):
+
+    _instances = dict()
+
+    def __new__(cls):
+        if cls not in cls._instances:
+            cls._instances[cls] = super().__new__(cls)
+
+        return cls._instances[cls]
+
     def __call__(self, l, r):
         for key, value in l.items():
             if key[0] is False:
@@ -246,6 +281,84 @@ class SameContextCheck(Check):
             return True
 
 
+class JoinCheck(Check):
+    """
+    Compiled version of `SameContextCheck` for a join node.
+
+    The variables in `join_on` are known to hold the same values in both
+    contexts (the join memories are indexed by them) so they are not
+    tested again. For the rest, the positions of the values to compare
+    are computed once per pair of context layouts and cached. Captured
+    facts are compared by identity.
+
+    """
+
+    _instances = dict()
+
+    def __new__(cls, join_on=()):
+        join_on = frozenset(join_on)
+        if join_on not in cls._instances:
+            obj = super().__new__(cls)
+            obj.join_on = join_on
+            obj.plans = dict()
+            cls._instances[join_on] = obj
+
+        return cls._instances[join_on]
+
+    def get_plan(self, left, right):
+        """
+        Return the tests needed to join the `left` and `right` layouts.
+
+        The plan is a pair of tuples of positions `(left, right)`: the
+        ones that must hold the same value and the ones that must not
+        (negated variables of the right context).
+
+        """
+        try:
+            return self.plans[(left, right)]
+        except KeyError:
+            equal = []
+            different = []
+            for name, idx in left.index.items():
+                if not isinstance(name, str):
+                    raise RuntimeError(
+                        'Negated value "%s" present before capture.'
+                        % name[1])
+                if name in right.index and name not in self.join_on:
+                    equal.append((idx, right.index[name]))
+                if (False, name) in right.index:
+                    different.append((idx, right.index[(False, name)]))
+
+            plan = (tuple(equal), tuple(different))
+            self.plans[(left, right)] = plan
+            return plan
+
+    @staticmethod
+    def same(a, b):
+        """Compare two context values (facts are compared by identity)."""
+        return a is b or (not isinstance(a, Fact) and a == b)
+
+    def __call__(self, left_context, right_context):
+        left = Context(left_context)
+        right = Context(right_context)
+        equal, different = self.get_plan(left.layout, right.layout)
+        left_values = left.values
+        right_values = right.values
+
+        for a, b in equal:
+            if not self.same(left_values[a], right_values[b]):
+                return False
+
+        for a, b in different:
+            if self.same(left_values[a], right_values[b]):
+                return False
+
+        return True
+
+    def __repr__(self):  # pragma: no cover
+        return "%s(%r)" % (self.__class__.__name__, sorted(self.join_on))
+
+
 class WhereCheck(Check, namedtuple('_WhereCheck', ['test'])):
 
     _instances = dict()
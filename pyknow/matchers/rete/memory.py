@@ -0,0 +1,189 @@
+"""Memories used by the RETE two-input nodes."""
+
+
+class BetaMemory:
+    """
+    Token memory indexed by the values of the join variables.
+
+    Tokens (`TokenInfo` objects) are stored in buckets keyed by the
+    values their context holds for the variables in `join_on`, so a
+    join only needs to visit the bucket of the incoming token instead of
+    the whole memory. Insertion and removal are O(1).
+
+    With an empty `join_on` all the tokens share the same bucket and
+    this behaves like a plain list.
+    """
+
+    def __init__(self, join_on=()):
+        self.join_on = tuple(join_on)
+        self.buckets = dict()
+        self.size = 0
+
+    def get_key(self, context):
+        """Return the bucket key for the given `context` mapping."""
+        return tuple(context[name] for name in self.join_on)
+
+    def _info_key(self, info):
+        if self.join_on:
+            return self.get_key(info.context)
+        else:
+            return ()
+
+    def append(self, info, key=None):
+        """Add `info` to the memory."""
+        if key is None:
+            key = self._info_key(info)
+
+        bucket = self.buckets.setdefault(key, dict())
+        bucket[info] = bucket.get(info, 0) + 1
+        self.size += 1
+
+    def remove(self, info, key=None):
+        """Remove `info` from the memory, raise `ValueError` if missing."""
+        if key is None:
+            key = self._info_key(info)
+
+        try:
+            bucket = self.buckets[key]
+            count = bucket[info]
+        except KeyError:
+            raise ValueError("%r not in memory" % (info, )) from None
+
+        if count == 1:
+            del bucket[info]
+            if not bucket:
+                del self.buckets[key]
+        else:
+            bucket[info] = count - 1
+        self.size -= 1
+
+    def get(self, key):
+        """Yield all the tokens stored in the bucket `key`."""
+        for info, count in self.buckets.get(key, {}).items():
+            for _ in range(count):
+                yield info
+
+    def __iter__(self):
+        for key in self.buckets:
+            yield from self.get(key)
+
+    def __contains__(self, info):
+        return info in self.buckets.get(self._info_key(info), ())
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):  # pragma: no cover
+        return "%s(%r)" % (self.__class__.__name__, list(self))
+
+
+class CounterMemory:
+    """
+    Mapping of tokens to match counters indexed by the join variables.
+
+    Used by negation nodes to keep, for each left token, the number of
+    right tokens matching it. The counters are kept in buckets keyed by
+    the values of the variables in `join_on`, so a right activation only
+    needs to update the counters of the tokens sharing its bucket.
+    """
+
+    def __init__(self, join_on=()):
+        self.join_on = tuple(join_on)
+        self.buckets = dict()
+        self.keys = dict()
+
+    def get_key(self, context):
+        """Return the bucket key for the given `context` mapping."""
+        return tuple(context[name] for name in self.join_on)
+
+    def set(self, info, count, key=None):
+        """Set the counter of `info` to `count`."""
+        if info in self.keys:
+            key = self.keys[info]
+        elif key is None:
+            if self.join_on:
+                key = self.get_key(info.context)
+            else:
+                key = ()
+
+        self.buckets.setdefault(key, dict())[info] = count
+        self.keys[info] = key
+
+    def pop(self, info):
+        """Remove `info` and return its counter."""
+        key = self.keys.pop(info)
+        bucket = self.buckets[key]
+        count = bucket.pop(info)
+        if not bucket:
+            del self.buckets[key]
+        return count
+
+    def get(self, key):
+        """Return the `(info, count)` pairs in the bucket `key`."""
+        return list(self.buckets.get(key, {}).items())
+
+    def __getitem__(self, info):
+        return self.buckets[self.keys[info]][info]
+
+    def __setitem__(self, info, count):
+        self.set(info, count)
+
+    def __delitem__(self, info):
+        self.pop(info)
+
+    def __contains__(self, info):
+        return info in self.keys
+
+    def __iter__(self):
+        return iter(self.keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __repr__(self):  # pragma: no cover
+        return "%s(%r)" % (self.__class__.__name__,
+                           {info: self[info] for info in self})
+
+
+class Lineage:
+    """
+    Record of the matches found between left and right tokens.
+
+    Two-input nodes register here every pair of matching tokens (and the
+    token produced by the match, if any), so when one of them is removed
+    its matches can be undone directly instead of testing it again
+    against the opposite memory.
+    """
+
+    def __init__(self):
+        self.left = dict()
+        self.right = dict()
+
+    def add(self, left, right, output=None):
+        """Register the match of `left` and `right` producing `output`."""
+        self.left.setdefault(left, dict())[right] = output
+        self.right.setdefault(right, dict())[left] = output
+
+    @staticmethod
+    def __pop(info, matches, partners):
+        result = matches.pop(info, {})
+        for partner in result:
+            partner_matches = partners[partner]
+            del partner_matches[info]
+            if not partner_matches:
+                del partners[partner]
+        return result
+
+    def pop_left(self, info):
+        """Forget the left token `info`; return its `{right: output}`."""
+        return self.__pop(info, self.left, self.right)
+
+    def pop_right(self, info):
+        """Forget the right token `info`; return its `{left: output}`."""
+        return self.__pop(info, self.right, self.left)
+
+    def __len__(self):
+        return sum(len(matches) for matches in self.left.values())
+
+    def __repr__(self):  # pragma: no cover
+        return "%s(%r)" % (self.__class__.__name__, self.left)
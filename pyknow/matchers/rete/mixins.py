@@ -7,6 +7,28 @@ from collections.abc import Callable
 ChildNode = namedtuple('ChildNode', ['node', 'callback'])
 
 
+def send_batch(children, tokens):
+    """
+    Send the list `tokens` to all `children`.
+
+    Children with a batch version of their callback (the method with the
+    same name and the `_batch` suffix) receive the whole list at once,
+    the rest receive the tokens one by one.
+
+    """
+    if not tokens:
+        return
+
+    for child in children:
+        name = getattr(child.callback, '__name__', None)
+        callback = getattr(child.node, '%s_batch' % name, None)
+        if callback is not None:
+            callback(tokens)
+        else:
+            for token in tokens:
+                child.callback(token)
+
+
 class NoMemory:
     """The node has no memory so we have nothing to do."""
 
@@ -22,6 +44,12 @@ class AnyChild:
         if node not in self.children:
             self.children.append(ChildNode(node, callback))
 
+    def replace_callback(self, node, old, new):
+        """Activate the child `node` with `new` instead of `old`."""
+        for idx, child in enumerate(self.children):
+            if child.node is node and child.callback == old:
+                self.children[idx] = ChildNode(node, new)
+
 
 class HasMatcher:
     """This node need a match callable as parameter."""
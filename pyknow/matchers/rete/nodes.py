@@ -8,14 +8,18 @@ needed in this implementation.
 """
 from collections.abc import Mapping
 from contextlib import suppress
-from itertools import chain
+from itertools import chain, groupby
 
 from pyknow.activation import Activation
+from pyknow.fact import Fact
+from pyknow.fieldconstraint import L
 from pyknow.rule import Rule
 from pyknow.watchers import MATCHER, MATCH
 
 from . import mixins
 from .abstract import Node, OneInputNode, TwoInputNode
+from .check import FeatureCheck, TypeCheck, get_feature
+from .memory import BetaMemory, CounterMemory, Lineage
 from .token import Token
 
 
@@ -31,22 +35,78 @@ class BusNode(mixins.AnyChild,
     This node cannot be activated in the same manner as the other nodes.
     No tokens can be sent to it since this is the node where the first
     tokens are built.
+
+    Children testing the type of the fact (`TypeCheck`) are dispatched
+    through a table keyed by the concrete class of the fact, so only the
+    children interested in that class are activated. The table is built
+    lazily, once per class.
     """
 
+    def __init__(self):
+        """Initialize the empty dispatch table."""
+        self.dispatch_table = dict()
+        super().__init__()
+
+    def add_child(self, node, callback):
+        """Add a child and invalidate the dispatch table."""
+        super().add_child(node, callback)
+        self.dispatch_table.clear()
+
+    def replace_callback(self, node, old, new):
+        """Replace a child callback and invalidate the dispatch table."""
+        super().replace_callback(node, old, new)
+        self.dispatch_table.clear()
+
+    def get_children(self, fact_type):
+        """Return the children interested in facts of type `fact_type`."""
+        try:
+            return self.dispatch_table[fact_type]
+        except KeyError:
+            children = tuple(
+                child for child in self.children
+                if not isinstance(getattr(child.node, 'matcher', None),
+                                  TypeCheck)
+                or child.node.matcher.matches_type(fact_type))
+            self.dispatch_table[fact_type] = children
+            return children
+
     def add(self, fact):
-        """Create a VALID token and send it to all children."""
+        """Create a VALID token and send it to all interested children."""
         token = Token.valid(fact)
         MATCHER.debug("<BusNode> added %r", token)
-        for child in self.children:
+        for child in self.get_children(type(fact)):
             child.callback(token)
 
     def remove(self, fact):
-        """Create an INVALID token and send it to all children."""
+        """Create an INVALID token and send it to all interested children."""
         token = Token.invalid(fact)
         MATCHER.debug("<BusNode> added %r", token)
-        for child in self.children:
+        for child in self.get_children(type(fact)):
             child.callback(token)
 
+    def __send_batch(self, facts, make_token):
+        by_type = dict()
+        for fact in facts:
+            by_type.setdefault(type(fact), list()).append(make_token(fact))
+
+        for fact_type, tokens in by_type.items():
+            MATCHER.debug("<BusNode> batch of %d %r", len(tokens), tokens[0])
+            mixins.send_batch(self.get_children(fact_type), tokens)
+
+    def add_batch(self, facts):
+        """
+        Create VALID tokens for `facts` and send them in batches.
+
+        The tokens are grouped by the type of their fact, and each group
+        is sent at once to the children interested in that type.
+
+        """
+        self.__send_batch(facts, Token.valid)
+
+    def remove_batch(self, facts):
+        """Create INVALID tokens for `facts` and send them in batches."""
+        self.__send_batch(facts, Token.invalid)
+
 
 class WhereNode(mixins.AnyChild,
                 mixins.HasMatcher,
@@ -61,6 +121,11 @@ class WhereNode(mixins.AnyChild,
             for child in self.children:
                 child.callback(token)
 
+    def _activate_batch(self, tokens):
+        mixins.send_batch(self.children,
+                          [token for token in tokens
+                           if self.matcher(token.context)])
+
 
 class FeatureTesterNode(mixins.AnyChild,
                         mixins.HasMatcher,
@@ -98,12 +163,12 @@ class FeatureTesterNode(mixins.AnyChild,
     the test do not pass.
     """
 
-    def _activate(self, token):
+    def _test(self, token):
         """
-        Activate this node.
+        Test the given token with this node matcher function.
 
-        Test the given token with this token matcher function and iff
-        the test pass update the token and pass to all children.
+        Return the token to pass to the children (updated with the
+        context returned by the matcher), or `None` if the test fails.
 
         """
         try:
@@ -111,7 +176,7 @@ class FeatureTesterNode(mixins.AnyChild,
         except AssertionError as exc:
             raise ValueError(exc) from exc
         else:
-            fact = list(token.data)[0]
+            fact = next(iter(token.data))
 
         match = self.matcher(fact)
 
@@ -121,17 +186,117 @@ class FeatureTesterNode(mixins.AnyChild,
                     if isinstance(key, tuple):  # Negated condition
                         if key[1] in token.context \
                                 and token.context[key[1]] == value:
-                            return False
+                            return None
                     else:
                         if token.context.get(key, value) != value:
-                            return False
+                            return None
                         if (False, key) in token.context \
                                 and token.context[(False, key)] == value:
-                            return False
-                token.context.update(match)
+                            return None
+                token = token._replace(context=token.context.extend(match))
+            return token
+        else:
+            return None
+
+    def _activate(self, token):
+        """
+        Activate this node.
+
+        Test the given token with this token matcher function and iff
+        the test pass update the token and pass to all children.
+
+        """
+        token = self._test(token)
+        if token is not None:
             for child in self.children:
                 child.callback(token)
 
+    def _activate_batch(self, tokens):
+        """Test all the tokens and send the passing ones to the children."""
+        mixins.send_batch(self.children,
+                          [token for token in map(self._test, tokens)
+                           if token is not None])
+
+
+class FeatureSwitchNode(mixins.NoMemory,
+                        OneInputNode):
+    """
+    Feature Switch Node.
+
+    Groups sibling `FeatureTesterNode` children testing the same
+    feature (`what`) against different literals. The value of the
+    feature is extracted once and used as a key to find the only branch
+    which can match, so the cost of the activation doesn't depend on the
+    number of literals being tested.
+
+    The children are still `FeatureTesterNode` instances, they perform
+    the real check (and any binding) after the dispatch.
+    """
+
+    def __init__(self, what):
+        """Initialize the node for testing the feature `what`."""
+        self.what = what
+        self.branches = dict()
+        super().__init__()
+
+    @staticmethod
+    def can_dispatch(check):
+        """Return True if `check` can be dispatched by this kind of node."""
+        return (isinstance(check, FeatureCheck)
+                and isinstance(check.how, L)
+                and not Fact.is_special(check.what))
+
+    def add_child(self, node, callback):
+        """Add a literal `FeatureTesterNode` as a new branch."""
+        try:
+            assert isinstance(node, FeatureTesterNode)
+            assert self.can_dispatch(node.matcher)
+            assert node.matcher.what == self.what
+        except AssertionError as exc:
+            raise TypeError(exc) from exc
+
+        branch = self.branches.setdefault(node.matcher.how.value, list())
+        if node not in (child.node for child in branch):
+            child = mixins.ChildNode(node, callback)
+            branch.append(child)
+            self.children.append(child)
+
+    def _get_branch(self, token):
+        """Return the children which may match the given token."""
+        fact = next(iter(token.data))
+
+        try:
+            value = get_feature(fact, self.what)
+        except (IndexError, KeyError, TypeError):
+            return ()
+
+        try:
+            return self.branches.get(value, ())
+        except TypeError:  # Unhashable value; let the checks decide.
+            return self.children
+
+    def _activate(self, token):
+        """Send the token only to the branch matching the feature value."""
+        for child in self._get_branch(token):
+            child.callback(token)
+
+    def _activate_batch(self, tokens):
+        """Split the tokens by branch and send each group at once."""
+        batches = dict()
+        for token in tokens:
+            children = self._get_branch(token)
+            if children:
+                key = id(children)
+                if key not in batches:
+                    batches[key] = (children, list())
+                batches[key][1].append(token)
+
+        for children, branch_tokens in batches.values():
+            mixins.send_batch(children, branch_tokens)
+
+    def __str__(self):  # pragma: no cover
+        return "%s: %s" % (self.__class__.__name__, self.what)
+
 
 class OrdinaryMatchNode(mixins.AnyChild,
                         mixins.HasMatcher,
@@ -150,84 +315,231 @@ class OrdinaryMatchNode(mixins.AnyChild,
     Matching pairs will be combined in one token containing facts from
     both and a combined context. This combined tokens will be sent to
     all children.
+
+    Both memories are indexed by the variables in `join_on` (variables
+    always bound by both inputs), so only the tokens with the same
+    values for them are given to the matching function.
+
+    While one of the memories is empty, the port on the other side is
+    unlinked: the parents registered with `add_parent` are told to call
+    `store_left` (or `store_right`) instead, which only keeps the memory
+    up to date. The port is linked again as soon as the opposite memory
+    gets a token.
     """
 
+    #: Activation method used by the parents while a port is unlinked.
+    UNLINKED = {'activate_left': 'store_left',
+                'activate_right': 'store_right'}
+
+    def __init__(self, matcher, join_on=()):
+        """Initialize the node with `matcher` and the join variables."""
+        self.join_on = tuple(join_on)
+        self.parents = list()
+        super().__init__(matcher)
+
     def _reset(self):
         """Wipe node memory."""
-        self.left_memory = list()
-        self.right_memory = list()
+        self.left_memory = BetaMemory(self.join_on)
+        self.right_memory = BetaMemory(self.join_on)
+        self.lineage = Lineage()
+        self.__update_links()
+
+    def add_parent(self, parent, port):
+        """Register `parent` to link and unlink the port `port`."""
+        if port in self.UNLINKED:
+            self.parents.append((parent, port))
+            self.__update_links()
+
+    def __update_links(self):
+        """Unlink the ports facing an empty memory and relink the rest."""
+        for parent, port in self.parents:
+            if port == 'activate_left':
+                linked = bool(self.right_memory)
+            else:
+                linked = bool(self.left_memory)
 
-    def __activation(self, token, branch_memory, matching_memory,
-                     is_left=True):
+            full = getattr(self, port)
+            unlinked = getattr(self, self.UNLINKED[port])
+            if linked:
+                parent.replace_callback(self, unlinked, full)
+            else:
+                parent.replace_callback(self, full, unlinked)
+
+    def __store(self, tokens, memory):
+        """Add or remove the tokens of an unlinked port to `memory`."""
+        was_empty = not memory
+
+        for token in tokens:
+            info = token.to_info()
+            key = memory.get_key(token.context)
+            if token.is_valid():
+                memory.append(info, key)
+            else:
+                with suppress(ValueError):
+                    memory.remove(info, key)
+
+        if was_empty != (not memory):
+            self.__update_links()
+
+    def store_left(self, token):
         """
-        Node activation internal function.
+        Unlinked left activation.
 
-        This is a generalization of both activation functions.
+        The right memory is empty, so there is nothing to match (or
+        unmatch): the token is only stored in (or removed from) the left
+        memory.
+
+        """
+        self.__store([token], self.left_memory)
 
-        The given token is added or removed from `branch_memory`
-        depending of its tag.
+    def store_left_batch(self, tokens):
+        """Unlinked left activation with a list of tokens."""
+        self.__store(tokens, self.left_memory)
 
-        For any other data in `matching_memory` the match function will
-        be called and if a match occurs a new token will be produced and
-        sent to all children.
+    def store_right(self, token):
+        """Unlinked right activation. See `store_left`."""
+        self.__store([token], self.right_memory)
 
+    def store_right_batch(self, tokens):
+        """Unlinked right activation with a list of tokens."""
+        self.__store(tokens, self.right_memory)
+
+    def __activation(self, tokens, branch_memory, matching_memory,
+                     is_left=True):
         """
-        if token.is_valid():
-            branch_memory.append(token.to_info())
-        else:
-            with suppress(ValueError):
-                branch_memory.remove(token.to_info())
+        Node activation internal function.
 
-        for other_data, other_context in matching_memory:
-            other_context = dict(other_context)
-            if is_left:
-                left_context = token.context
-                right_context = other_context
-            else:
-                left_context = other_context
-                right_context = token.context
+        This is a generalization of both activation functions, for a
+        list of tokens. Return the list of tokens produced.
 
-            match = self.matcher(left_context, right_context)
+        The given tokens are added or removed from `branch_memory`
+        depending of their tag.
 
-            if match:
-                MATCH.info("%s (%s | %s) = True",
-                           self.__class__.__name__,
-                           left_context,
-                           right_context)
+        VALID tokens are grouped by the values of the join variables
+        (hash join) and each group is tested against the tokens in
+        `matching_memory` sharing those values. If a match occurs a new
+        token is produced. The match is recorded in the node lineage.
 
-                newcontext = {k: v for k, v in token.context.items()
-                              if isinstance(k, str)}
+        For an INVALID token the matches recorded in the lineage are
+        undone, producing the INVALID version of the tokens produced by
+        them without calling the match function again.
 
-                for k, v in other_context.items():
-                    if not isinstance(k, tuple):
-                        # Negated value are not needed any further
-                        newcontext[k] = v
+        """
+        produced = list()
+        was_empty = not branch_memory
+
+        for is_valid, group in groupby(tokens, key=Token.is_valid):
+            if not is_valid:
+                for token in group:
+                    info = token.to_info()
+                    with suppress(ValueError):
+                        branch_memory.remove(
+                            info, branch_memory.get_key(token.context))
+
+                    if is_left:
+                        matches = self.lineage.pop_left(info)
+                    else:
+                        matches = self.lineage.pop_right(info)
+
+                    produced.extend(
+                        Token._make((Token.TagType.INVALID,
+                                     newtoken.data,
+                                     newtoken.context))
+                        for newtoken in matches.values())
+                continue
+
+            buckets = dict()
+            for token in group:
+                info = token.to_info()
+                key = branch_memory.get_key(token.context)
+                branch_memory.append(info, key)
+                buckets.setdefault(key, list()).append((token, info))
+
+            for key, entries in buckets.items():
+                others = list(matching_memory.get(key))
+                if not others:
+                    continue
+
+                for token, info in entries:
+                    for other in others:
+                        newtoken = self.__match(token, info, other, is_left)
+                        if newtoken is not None:
+                            produced.append(newtoken)
+
+        if was_empty != (not branch_memory):
+            self.__update_links()
+
+        return produced
+
+    def __match(self, token, info, other, is_left):
+        """Match `token` with `other`; return the new token or `None`."""
+        other_data, other_context = other
+        if is_left:
+            left_context = token.context
+            right_context = other_context
+        else:
+            left_context = other_context
+            right_context = token.context
 
-                newtoken = Token(token.tag,
-                                 token.data | other_data,
-                                 newcontext)
+        match = self.matcher(left_context, right_context)
 
-                for child in self.children:
-                    child.callback(newtoken)
+        if match:
+            MATCH.info("%s (%s | %s) = True",
+                       self.__class__.__name__,
+                       left_context,
+                       right_context)
+
+            # Negated value are not needed any further
+            newtoken = Token._make((token.tag,
+                                    token.data | other_data,
+                                    token.context.join(other_context)))
+
+            if is_left:
+                self.lineage.add(info, other, newtoken)
             else:
-                MATCH.debug("%s (%s | %s) = False",
-                            self.__class__.__name__,
-                            left_context,
-                            right_context)
+                self.lineage.add(other, info, newtoken)
+
+            return newtoken
+        else:
+            MATCH.debug("%s (%s | %s) = False",
+                        self.__class__.__name__,
+                        left_context,
+                        right_context)
+            return None
 
     def _activate_left(self, token):
         """Node left activation."""
-        self.__activation(token,
-                          self.left_memory,
-                          self.right_memory,
-                          is_left=True)
+        for newtoken in self.__activation([token],
+                                          self.left_memory,
+                                          self.right_memory,
+                                          is_left=True):
+            for child in self.children:
+                child.callback(newtoken)
 
     def _activate_right(self, token):
         """Node right activation."""
-        self.__activation(token,
-                          self.right_memory,
-                          self.left_memory,
-                          is_left=False)
+        for newtoken in self.__activation([token],
+                                          self.right_memory,
+                                          self.left_memory,
+                                          is_left=False):
+            for child in self.children:
+                child.callback(newtoken)
+
+    def _activate_left_batch(self, tokens):
+        """Node left activation with a list of tokens."""
+        mixins.send_batch(self.children,
+                          self.__activation(tokens,
+                                            self.left_memory,
+                                            self.right_memory,
+                                            is_left=True))
+
+    def _activate_right_batch(self, tokens):
+        """Node right activation with a list of tokens."""
+        mixins.send_batch(self.children,
+                          self.__activation(tokens,
+                                            self.right_memory,
+                                            self.left_memory,
+                                            is_left=False))
 
 
 class ConflictSetNode(mixins.AnyChild,
@@ -239,6 +551,14 @@ class ConflictSetNode(mixins.AnyChild,
     this node will produce an activation (VALID token) or deactivation
     (INVALID token) of the internal `rule` with the token context and
     facts.
+
+    Pending changes are kept as token infos, so a token cancelled by
+    another one before `get_activations` is called never produces an
+    `Activation`.
+
+    When `dirty` is set to a dictionary, the node registers itself as a
+    key of it every time its pending changes are modified, so the
+    matcher only has to collect the activations of these nodes.
     """
 
     def __init__(self, rule):
@@ -252,6 +572,7 @@ class ConflictSetNode(mixins.AnyChild,
 
         self.added = set()
         self.removed = set()
+        self.dirty = None
 
         super().__init__()
 
@@ -264,32 +585,34 @@ class ConflictSetNode(mixins.AnyChild,
 
         info = token.to_info()
 
-        activation = Activation(
-            self.rule,
-            frozenset(info.data),
-            {k: v for k, v in info.context if isinstance(k, str)})
-
         if token.is_valid():
-            if info not in self.memory:
-                self.memory.add(info)
-                if activation in self.removed:
-                    self.removed.remove(activation)
-                else:
-                    self.added.add(activation)
+            if info in self.memory:
+                return
+            self.memory.add(info)
+            if info in self.removed:
+                self.removed.remove(info)
+            else:
+                self.added.add(info)
         else:
             try:
                 self.memory.remove(info)
-            except ValueError:
-                pass
+            except KeyError:
+                return
+            if info in self.added:
+                self.added.remove(info)
             else:
-                if activation in self.added:
-                    self.added.remove(activation)
-                else:
-                    self.removed.add(activation)
+                self.removed.add(info)
+
+        if self.dirty is not None:
+            self.dirty[self] = None
 
     def get_activations(self):
-        """Return a list of activations."""
-        res = (self.added, self.removed)
+        """Return the activations added and removed since the last call."""
+        rule = self.rule
+        res = ([Activation(rule, info.data, info.context)
+                for info in self.added],
+               [Activation(rule, info.data, info.context)
+                for info in self.removed])
 
         self.added = set()
         self.removed = set()
@@ -313,12 +636,26 @@ class NotNode(mixins.AnyChild,
     input ports and try to match tokens arriving in both of them. But
     pass VALID tokens to the children when no matches are found and
     INVALID tokens when they are.
+
+    The left memory keeps the number of right tokens matching each left
+    token. Both memories are indexed by the variables in `join_on`, so
+    adding or removing a right token only updates the counters of the
+    left tokens with the same values for them.
     """
 
+    #: Left tokens pass when they have no matches.
+    negated = True
+
+    def __init__(self, matcher, join_on=()):
+        """Initialize the node with `matcher` and the join variables."""
+        self.join_on = tuple(join_on)
+        super().__init__(matcher)
+
     def _reset(self):
         """Wipe node internal memory."""
-        self.left_memory = dict()
-        self.right_memory = list()
+        self.left_memory = CounterMemory(self.join_on)
+        self.right_memory = BetaMemory(self.join_on)
+        self.lineage = Lineage()
 
     def _activate_left(self, token):
         """
@@ -327,72 +664,189 @@ class NotNode(mixins.AnyChild,
         In case of a valid token this activations test the right memory
         with the given token and looks for the number of matches. The
         token and the number of occurences are stored in the left
-        memory.
+        memory, and the matches in the node lineage.
 
         If the number of matches is zero the token activates all children.
 
         """
-        if not self.right_memory:
-            if token.is_valid():
-                self.left_memory[token.to_info()] = 0
-            else:
-                del self.left_memory[token.to_info()]
+        info = token.to_info()
+
+        if token.is_valid():
+            key = self.left_memory.get_key(token.context)
+            count = 0
+            for right in self.right_memory.get(key):
+                if self.matcher(token.context, right.context):
+                    self.lineage.add(info, right)
+                    count += 1
 
+            self.left_memory.set(info, count, key)
+        else:
+            count = self.left_memory.pop(info)
+            self.lineage.pop_left(info)
+
+        if (count == 0) is self.negated:
             for child in self.children:
                 child.callback(token)
 
-        elif token.is_valid():
-            count = 0
+    def _activate_right(self, token):
+        """
+        Activate from the right.
 
-            for _, right_context in self.right_memory:
-                if self.matcher(token.context, dict(right_context)):
-                    count += 1
+        A valid token is tested against the left tokens sharing the join
+        values; an invalid one takes its matches from the node lineage.
+        The counter of every matching left token is updated (substracting
+        if the given token is invalid and adding otherwise). Depending on
+        the result of this operation a new token is generated and
+        passing to all children.
+
+        """
+        info = token.to_info()
+        key = self.right_memory.get_key(token.context)
+
+        if token.is_valid():
+            self.right_memory.append(info, key)
+            inc = 1
+            matches = [left for left, _ in self.left_memory.get(key)
+                       if self.matcher(left.context, token.context)]
+            for left in matches:
+                self.lineage.add(left, info)
+        else:
+            inc = -1
+            self.right_memory.remove(info, key)
+            matches = self.lineage.pop_right(info)
+
+        for left in matches:
+            newcount = self.left_memory[left] + inc
+            self.left_memory.set(left, newcount)
+            if (newcount == 0 and inc == -1) or \
+                    (newcount == 1 and inc == 1):
+                if (inc == -1) is self.negated:
+                    newtoken = left.to_valid_token()
+                else:
+                    newtoken = left.to_invalid_token()
 
-            if count == 0:
                 for child in self.children:
-                    child.callback(token)
+                    child.callback(newtoken)
+
+
+class ExistsNode(NotNode):
+    """
+    Exists Node.
+
+    The opposite of `NotNode`: left tokens pass when at least one right
+    token matches them. A new token is sent to the children only when
+    the number of matches crosses zero.
+    """
+
+    negated = False
+
+
+class ForallNode(mixins.AnyChild,
+                 mixins.HasMatcher,
+                 TwoInputNode):
+    """
+    Forall Node.
+
+    Represents the condition *for every leader token there is a
+    matching right token*. This node has three input ports:
+
+      - `left`: The tokens to pass (or cancel) while the condition holds.
+
+      - `leader`: The tokens of the leader condition.
+
+      - `right`: The tokens of the follower conditions.
+
+    Each leader token keeps the number of matching right tokens, and the
+    node keeps the number of leader tokens without any match. Left
+    tokens are sent to the children only when this number crosses zero.
+    """
+
+    def __init__(self, matcher, join_on=()):
+        """Initialize the node with `matcher` and the join variables."""
+        self.join_on = tuple(join_on)
+        super().__init__(matcher)
+
+    def _reset(self):
+        """Wipe node internal memory."""
+        self.left_memory = set()
+        self.leader_memory = CounterMemory(self.join_on)
+        self.right_memory = BetaMemory(self.join_on)
+        self.lineage = Lineage()
+        self.unmatched = 0
+
+    def _update_unmatched(self, inc):
+        """Update the unmatched leaders count and notify the children."""
+        self.unmatched += inc
+
+        if self.unmatched == 0 and inc == -1:
+            for info in self.left_memory:
+                newtoken = info.to_valid_token()
+                for child in self.children:
+                    child.callback(newtoken)
+        elif self.unmatched == 1 and inc == 1:
+            for info in self.left_memory:
+                newtoken = info.to_invalid_token()
+                for child in self.children:
+                    child.callback(newtoken)
 
-            self.left_memory[token.to_info()] = count
+    def _activate_left(self, token):
+        """Store the token and pass it if the condition holds."""
+        if token.is_valid():
+            self.left_memory.add(token.to_info())
         else:
+            self.left_memory.remove(token.to_info())
+
+        if self.unmatched == 0:
+            for child in self.children:
+                child.callback(token)
+
+    def activate_leader(self, token):
+        """Make a copy of the received token and call `_activate_leader`."""
+        MATCHER.debug("Node <%s> activated leader with token %r",
+                      self, token)
+        return self._activate_leader(token.copy())
+
+    def _activate_leader(self, token):
+        """Count the matches of a new leader token."""
+        info = token.to_info()
+
+        if token.is_valid():
+            key = self.leader_memory.get_key(token.context)
             count = 0
-            for _, right_context in self.right_memory:
-                if self.matcher(token.context, dict(right_context)):
+            for right in self.right_memory.get(key):
+                if self.matcher(token.context, right.context):
+                    self.lineage.add(info, right)
                     count += 1
-                    break
 
+            self.leader_memory.set(info, count, key)
             if count == 0:
-                for child in self.children:
-                    child.callback(token)
-
-            del self.left_memory[token.to_info()]
+                self._update_unmatched(1)
+        else:
+            self.lineage.pop_left(info)
+            if self.leader_memory.pop(info) == 0:
+                self._update_unmatched(-1)
 
     def _activate_right(self, token):
-        """
-        Activate from the right.
-
-        Go over the left memory and find matching data, when found
-        update the counter (substracting if the given token is invalid
-        and adding otherwise). Depending on the result of this operation
-        a new token is generated and passing to all children.
+        """Update the counters of the matching leader tokens."""
+        info = token.to_info()
+        key = self.right_memory.get_key(token.context)
 
-        """
         if token.is_valid():
-            self.right_memory.append(token.to_info())
+            self.right_memory.append(info, key)
             inc = 1
+            matches = [leader for leader, _ in self.leader_memory.get(key)
+                       if self.matcher(leader.context, token.context)]
+            for leader in matches:
+                self.lineage.add(leader, info)
         else:
             inc = -1
-            self.right_memory.remove(token.to_info())
-
-        for left in self.left_memory:
-            if self.matcher(dict(left.context), token.context):
-                self.left_memory[left] += inc
-                newcount = self.left_memory[left]
-                if (newcount == 0 and inc == -1) or \
-                        (newcount == 1 and inc == 1):
-                    if inc == -1:
-                        newtoken = left.to_valid_token()
-                    else:
-                        newtoken = left.to_invalid_token()
-
-                    for child in self.children:
-                        child.callback(newtoken)
+            self.right_memory.remove(info, key)
+            matches = self.lineage.pop_right(info)
+
+        for leader in matches:
+            newcount = self.leader_memory[leader] + inc
+            self.leader_memory.set(leader, newcount)
+            if newcount == 0 and inc == -1:
+                self._update_unmatched(1)
+            elif newcount == 1 and inc == 1:
+                self._update_unmatched(-1)
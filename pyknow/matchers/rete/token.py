@@ -7,6 +7,181 @@ from enum import Enum
 from pyknow.fact import Fact
 
 
+class Layout:
+    """
+    Slot positions of the variables of a context.
+
+    Layouts are interned by the set of variable names, so every context
+    holding the same variables shares the same positions and two
+    contexts can be compared by comparing their tuples of values.
+
+    The layout also caches the plans used to build the contexts derived
+    from the ones using it (see `Context.extend` and `Context.join`).
+    """
+
+    _instances = dict()
+
+    def __new__(cls, names):
+        key = frozenset(names)
+        try:
+            return cls._instances[key]
+        except KeyError:
+            self = super().__new__(cls)
+            self.names = tuple(sorted(key, key=repr))
+            self.index = {name: idx for idx, name in enumerate(self.names)}
+            self.plans = dict()
+            cls._instances[key] = self
+            return self
+
+    def extend_plan(self, names):
+        """
+        Return the layout resulting of adding `names` to this one.
+
+        Also returns, for each slot of the new layout, the position of
+        the value in this layout or `None` if it must be taken from the
+        new values.
+
+        """
+        key = (False, names)
+        try:
+            return self.plans[key]
+        except KeyError:
+            layout = Layout(self.names + names)
+            new = set(names)
+            plan = (layout,
+                    tuple(None if name in new else self.index[name]
+                          for name in layout.names))
+            self.plans[key] = plan
+            return plan
+
+    def join_plan(self, other):
+        """
+        Return the layout of the join of this layout with `other`.
+
+        Only the variable names (strings) are kept. For each slot of
+        the new layout returns a pair `(from_other, position)`; values
+        present in both layouts are taken from `other`.
+
+        """
+        key = (True, other)
+        try:
+            return self.plans[key]
+        except KeyError:
+            layout = Layout(name
+                            for name in self.names + other.names
+                            if isinstance(name, str))
+            plan = (layout,
+                    tuple((True, other.index[name])
+                          if name in other.index
+                          else (False, self.index[name])
+                          for name in layout.names))
+            self.plans[key] = plan
+            return plan
+
+    def __repr__(self):  # pragma: no cover
+        return "%s(%r)" % (self.__class__.__name__, self.names)
+
+
+class Context(Mapping):
+    """
+    Inmutable mapping of variables to values stored in slots.
+
+    The values are kept in a tuple ordered by the (interned) `Layout` of
+    the context, so copying is free and hashing and comparing contexts
+    are tuple operations.
+    """
+
+    __slots__ = ('layout', 'values', '_hash')
+
+    def __new__(cls, mapping=None):
+        """Return a context with the contents of `mapping`."""
+        if isinstance(mapping, Context):
+            return mapping
+        elif not mapping:
+            return cls.EMPTY
+
+        mapping = dict(mapping)
+        layout = Layout(mapping)
+        return cls._make(layout,
+                         tuple(mapping[name] for name in layout.names))
+
+    @classmethod
+    def _make(cls, layout, values):
+        self = super().__new__(cls)
+        self.layout = layout
+        self.values = values
+        self._hash = None
+        return self
+
+    def extend(self, mapping):
+        """
+        Return a new context with the pairs of `mapping` added.
+
+        Values already present for the keys of `mapping` are replaced.
+
+        """
+        if not mapping:
+            return self
+
+        layout, plan = self.layout.extend_plan(tuple(mapping))
+        values = self.values
+        return self._make(
+            layout,
+            tuple(mapping[name] if idx is None else values[idx]
+                  for name, idx in zip(layout.names, plan)))
+
+    def join(self, other):
+        """
+        Return the variables of this context updated with `other`.
+
+        Negated values (non string keys) are not needed after a join and
+        are not part of the result.
+
+        """
+        other = Context(other)
+        layout, plan = self.layout.join_plan(other.layout)
+        values = (self.values, other.values)
+        return self._make(
+            layout,
+            tuple(values[from_other][idx] for from_other, idx in plan))
+
+    def __getitem__(self, name):
+        return self.values[self.layout.index[name]]
+
+    def get(self, name, default=None):
+        idx = self.layout.index.get(name)
+        if idx is None:
+            return default
+        else:
+            return self.values[idx]
+
+    def __contains__(self, name):
+        return name in self.layout.index
+
+    def __iter__(self):
+        return iter(self.layout.names)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __eq__(self, other):
+        if isinstance(other, Context):
+            return self.layout is other.layout and self.values == other.values
+        else:
+            return super().__eq__(other)
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash((self.layout, self.values))
+        return self._hash
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, dict(self))
+
+
+Context.EMPTY = Context._make(Layout(()), ())
+
+
 class TokenInfo(namedtuple('_TokenInfo', ['data', 'context'])):
     """Tag agnostig version of Token with inmutable data."""
 
@@ -14,15 +189,15 @@ class TokenInfo(namedtuple('_TokenInfo', ['data', 'context'])):
         """Return a namedtuple instance with inmutable data."""
         return super(TokenInfo, cls).__new__(cls,
                                              frozenset(data),
-                                             frozenset(context.items()))
+                                             Context(context))
 
     def to_valid_token(self):
         """Create a VALID token using this data."""
-        return Token.valid(self.data, dict(self.context))
+        return Token.valid(self.data, self.context)
 
     def to_invalid_token(self):
         """Create an INVALID token using this data."""
-        return Token.invalid(self.data, dict(self.context))
+        return Token.invalid(self.data, self.context)
 
 
 class Token(namedtuple('_Token', ['tag', 'data', 'context'])):
@@ -44,9 +219,12 @@ class Token(namedtuple('_Token', ['tag', 'data', 'context'])):
         - `data`: A Fact or an iterable of Facts.
         - `context`: A mapping or None.
 
+        Both `data` and `context` are stored in inmutable containers (a
+        `frozenset` and a `Context`).
+
         """
         if context is None:
-            context = {}
+            context = Context.EMPTY
 
         try:
             assert isinstance(tag, cls.TagType), \
@@ -58,8 +236,9 @@ class Token(namedtuple('_Token', ['tag', 'data', 'context'])):
         except AssertionError as exc:
             raise TypeError(exc) from exc
 
-        data = {data} if isinstance(data, Fact) else set(data)
-        self = super(Token, cls).__new__(cls, tag, data, context)
+        data = frozenset((data, )) if isinstance(data, Fact) \
+            else frozenset(data)
+        self = super(Token, cls).__new__(cls, tag, data, Context(context))
         return self
 
     def to_info(self):
@@ -90,8 +269,8 @@ class Token(namedtuple('_Token', ['tag', 'data', 'context'])):
         """
         Make a new instance of this Token.
 
-        This method makes a copy of the mutable part of the token before
-        making the instance.
+        The data and the context are inmutable, so they are shared by
+        both tokens.
 
         """
-        return self.__class__(self.tag, self.data.copy(), self.context.copy())
+        return self._make(self)
@@ -1,15 +1,21 @@
 from functools import singledispatch
 
-from .check import FeatureCheck, TypeCheck, FactCapture, SameContextCheck
+from .check import FeatureCheck, TypeCheck, FactCapture, JoinCheck
 from .check import WhereCheck
 from .dnf import dnf
 from .nodes import ConflictSetNode, NotNode, OrdinaryMatchNode
-from .nodes import WhereNode
+from .nodes import WhereNode, ExistsNode, ForallNode
 from pyknow.conditionalelement import NOT, OR, AND, TEST, EXISTS, FORALL
 from pyknow.fact import InitialFact, Fact
+from pyknow.fieldconstraint import L, W, P, ANDFC, ORFC
 from pyknow.rule import Rule
 
 
+#: Names of the captures of the patterns without `__bind__`. Equal
+#: patterns share their checks, so they get the same name.
+PATTERN_CAPTURES = dict()
+
+
 @singledispatch
 def prepare_rule(exp):
     """
@@ -101,13 +107,106 @@ def generate_checks(fact):
 
     # Assign the matching fact to the context
     if not fact_captured:
-        yield FactCapture("__pattern_%s__" % id(fact))
+        yield FactCapture(get_pattern_capture(fact))
+
+
+def get_pattern_capture(fact):
+    """Return the name of the capture of the pattern `fact`."""
+    try:
+        return PATTERN_CAPTURES[fact]
+    except KeyError:
+        return PATTERN_CAPTURES.setdefault(
+            fact, "__pattern_%d__" % len(PATTERN_CAPTURES))
+
+
+@singledispatch
+def _bound_by_constraint(fc):
+    return frozenset()
+
+
+@_bound_by_constraint.register(L)
+@_bound_by_constraint.register(W)
+@_bound_by_constraint.register(P)
+def _(fc):
+    if fc.__bind__ is None:
+        return frozenset()
+    else:
+        return frozenset([fc.__bind__])
+
+
+@_bound_by_constraint.register(ANDFC)
+def _(fc):
+    return frozenset().union(*[_bound_by_constraint(x) for x in fc])
+
+
+@_bound_by_constraint.register(ORFC)
+def _(fc):
+    return frozenset.intersection(*[_bound_by_constraint(x) for x in fc])
+
+
+def get_bound_variables(ce):
+    """
+    Given a conditional element, return the set of variables which will
+    be bound in every token matching it.
+
+    Variables bound only in some branches of an `ORFC` and negated
+    bindings are not included.
 
+    """
+    if isinstance(ce, Fact):
+        variables = set()
+        if ce.__bind__ is not None:
+            variables.add(ce.__bind__)
+        for key, value in ce.items():
+            if not Fact.is_special(key):
+                variables.update(_bound_by_constraint(value))
+        return frozenset(variables)
+    elif isinstance(ce, (Rule, AND)):
+        return frozenset().union(*[get_bound_variables(e) for e in ce])
+    else:
+        # NOT, TEST, EXISTS and FORALL don't bind new variables.
+        return frozenset()
+
+
+def wire_rule(rule, alpha_terminals, lhs=None, shared_nodes=None):
+    """
+    Wire the beta network of `rule` on top of the `alpha_terminals`.
 
-def wire_rule(rule, alpha_terminals, lhs=None):
+    Beta nodes are looked up in `shared_nodes` before being created, so
+    rules (or DNF branches) with structurally identical prefixes reuse
+    the same join nodes and memories. Pass the same dictionary across
+    calls to share nodes between rules.
+
+    """
     if lhs is None:
         lhs = rule
 
+    if shared_nodes is None:
+        shared_nodes = dict()
+
+    def _get_node(node_cls, matcher, inputs, **kwargs):
+        """
+        Return a `node_cls` node fed by `inputs`, creating it if needed.
+
+        `inputs` is a sequence of `(parent, port)` pairs, where `port` is
+        the name of the activation method of the node to connect to.
+
+        """
+        key = (node_cls,
+               matcher,
+               tuple(sorted((k, tuple(v)) for k, v in kwargs.items())),
+               tuple(inputs))
+
+        try:
+            return shared_nodes[key]
+        except KeyError:
+            node = node_cls(matcher, **kwargs)
+            for parent, port in inputs:
+                parent.add_child(node, getattr(node, port))
+                node.add_parent(parent, port)
+            shared_nodes[key] = node
+            return node
+
     @singledispatch
     def _wire_rule(elem):
         raise TypeError("Unknown type %s" % type(elem))
@@ -119,41 +218,31 @@ def wire_rule(rule, alpha_terminals, lhs=None):
     @_wire_rule.register(FORALL)
     def _(elem):
         leader = elem[0]
-        followers = elem[1:]
+        followers = AND(*elem[1:])
 
         initial_fact_node = _wire_rule(InitialFact())
         leader_node = _wire_rule(leader)
-        followers_node = _wire_rule(AND(*followers))
-        not_node_1 = NotNode(SameContextCheck())
-        not_node_2 = NotNode(SameContextCheck())
-
-        # NotNode1
-        followers_node.add_child(not_node_1, not_node_1.activate_right)
-        leader_node.add_child(not_node_1, not_node_1.activate_left)
-
-        # NotNode2
-        not_node_1.add_child(not_node_2, not_node_2.activate_right)
-        initial_fact_node.add_child(not_node_2, not_node_2.activate_left)
-
-        return not_node_2
+        followers_node = _wire_rule(followers)
+        join_on = sorted(get_bound_variables(leader)
+                         & get_bound_variables(followers),
+                         key=str)
+
+        return _get_node(ForallNode,
+                         JoinCheck(join_on),
+                         [(initial_fact_node, 'activate_left'),
+                          (leader_node, 'activate_leader'),
+                          (followers_node, 'activate_right')],
+                         join_on=join_on)
 
     @_wire_rule.register(EXISTS)
     def _(elem):
-        # Create new nodes
         condition_node = _wire_rule(elem[0])
         initial_fact_node = _wire_rule(InitialFact())
-        not_node_1 = NotNode(SameContextCheck())
-        not_node_2 = NotNode(SameContextCheck())
-
-        # NotNode1
-        condition_node.add_child(not_node_1, not_node_1.activate_right)
-        initial_fact_node.add_child(not_node_1, not_node_1.activate_left)
 
-        # NotNode2
-        initial_fact_node.add_child(not_node_2, not_node_2.activate_left)
-        not_node_1.add_child(not_node_2, not_node_2.activate_right)
-
-        return not_node_2
+        return _get_node(ExistsNode,
+                         JoinCheck(),
+                         [(initial_fact_node, 'activate_left'),
+                          (condition_node, 'activate_right')])
 
     @_wire_rule.register(Rule)
     @_wire_rule.register(AND)
@@ -165,34 +254,38 @@ def wire_rule(rule, alpha_terminals, lhs=None):
                 return _wire_rule(elem[0])
         else:  # > 1. Because < 1 is not possible at this point.
             current_node = None
+            bound = get_bound_variables(elem[0])
             for f, s in zip(elem, elem[1:]):
                 if isinstance(s, TEST):
                     if current_node is None:
                         current_node = _wire_rule(f)
 
                     # A TestNode after the previous node
-                    new_node = _wire_rule(s)
-                    current_node.add_child(new_node, new_node.activate)
-                    current_node = new_node
+                    current_node = _get_node(WhereNode,
+                                             WhereCheck(s[0]),
+                                             [(current_node, 'activate')])
                 else:
                     if isinstance(s, NOT):
                         node_cls = NotNode
+                        right_bound = get_bound_variables(s[0])
+                        join_on = sorted(bound & right_bound, key=str)
                     else:
                         node_cls = OrdinaryMatchNode
+                        right_bound = get_bound_variables(s)
+                        join_on = sorted(bound & right_bound, key=str)
+                        bound |= right_bound
 
                     if current_node is None:
-                        current_node = node_cls(SameContextCheck())
                         left_branch = _wire_rule(f)
-                        right_branch = _wire_rule(s)
                     else:
                         left_branch = current_node
-                        right_branch = _wire_rule(s)
-                        current_node = node_cls(SameContextCheck())
-
-                    left_branch.add_child(current_node,
-                                          current_node.activate_left)
-                    right_branch.add_child(current_node,
-                                           current_node.activate_right)
+                    right_branch = _wire_rule(s)
+                    current_node = _get_node(
+                        node_cls,
+                        JoinCheck(join_on),
+                        [(left_branch, 'activate_left'),
+                         (right_branch, 'activate_right')],
+                        join_on=join_on)
             return current_node
 
     @_wire_rule.register(OR)
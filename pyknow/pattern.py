@@ -1,4 +1,6 @@
 class Bindable:
+    __slots__ = ()
+
     def __rlshift__(self, other):
         if not isinstance(other, str):
             raise TypeError("%s can only be binded to a string" % self)
@@ -1,30 +1,271 @@
-from functools import lru_cache
-import bisect
+import abc
+import random
 
 from pyknow.abstract import Strategy
+from pyknow.agenda import HeapAgenda, SalienceAgenda
+from pyknow.conditionalelement import AND, OR, TEST
+from pyknow.fact import Fact
+from pyknow.fieldconstraint import L, W, P
+from pyknow.matchers.rete.check import FactCapture
+from pyknow.matchers.rete.utils import generate_checks
 
 
-class DepthStrategy(Strategy):
-    @lru_cache()
+class KeyStrategy(Strategy):
+    """
+    Base for the strategies sorting the activations by a key computed
+    once per activation by `get_key`.
+
+    """
+    @abc.abstractmethod
+    def get_key(self, activation):  # pragma: no cover
+        """Return the key of `activation` in the agenda."""
+        pass
+
+    def _update_agenda(self, agenda, added, removed):
+        for act in added:
+            if act.key is None:
+                act.key = self.get_key(act)
+            agenda.add(act)
+
+        for act in removed:
+            if act.key is None:
+                act.key = self.get_key(act)
+            agenda.remove(act)
+
+
+class HeapStrategy(KeyStrategy):
+    """
+    Base for the strategies keeping the activations in a `HeapAgenda`.
+
+    Activations with the same key are run in LIFO order, unless `lifo`
+    is set to `False`.
+
+    """
+    lifo = True
+
+    def new_agenda(self):
+        """Return a `HeapAgenda`."""
+        return HeapAgenda(lifo=self.lifo)
+
+
+class DepthStrategy(HeapStrategy):
     def get_key(self, activation):
         salience = activation.rule.salience
         facts = sorted((f['__factid__'] for f in activation.facts),
                        reverse=True)
         return (salience, facts)
 
+
+class SalienceDepthStrategy(KeyStrategy):
+    """
+    Order the activations by salience and, inside a salience level, by
+    recency: the last activation added is the next to run.
+
+    Uses a `SalienceAgenda`, so insertions and removals don't depend on
+    the number of pending activations. Unlike `DepthStrategy`, the
+    activations added at the same time (by the same change in the
+    working memory) are not sorted by the recency of their facts.
+
+    """
+    lifo = True
+
+    def get_key(self, activation):
+        return activation.rule.salience
+
+    def new_agenda(self):
+        """Return a `SalienceAgenda`."""
+        return SalienceAgenda(lifo=self.lifo)
+
+
+class SalienceBreadthStrategy(SalienceDepthStrategy):
+    """
+    Like `SalienceDepthStrategy`, but activations of the same salience
+    are run in the order they were added.
+
+    """
+    lifo = False
+
+
+#: CLIPS `breadth` strategy.
+BreadthStrategy = SalienceBreadthStrategy
+
+
+def get_recency(activation):
+    """Return the fact ids of `activation`, the most recent first."""
+    return tuple(sorted((f['__factid__'] for f in activation.facts),
+                        reverse=True))
+
+
+def get_first_captures(rule):
+    """
+    Return the names the facts matching the first pattern of `rule` are
+    captured with in the context of the activations, one per DNF
+    branch.
+
+    `rule` must be prepared for the RETE network (like the rules of the
+    activations), so the captures are the ones of its patterns.
+
+    """
+    def _first(ce):
+        if isinstance(ce, Fact):
+            yield from (check.__bind__ for check in generate_checks(ce)
+                        if isinstance(check, FactCapture))
+        elif isinstance(ce, OR):
+            for branch in ce:
+                yield from _first(branch)
+        elif isinstance(ce, AND) and ce:
+            yield from _first(ce[0])
+
+    if rule:
+        return tuple(_first(rule[0]))
+    else:
+        return ()
+
+
+def get_specificity(ce, bound=None):
+    """
+    Return the number of tests of the conditional element `ce`.
+
+    As in CLIPS, every comparison with a literal or with an already
+    bound variable, every predicate and every `TEST` counts as one. For
+    `OR` the most specific branch is used.
+
+    """
+    if bound is None:
+        bound = set()
+
+    if isinstance(ce, Fact):
+        return sum(get_specificity(value, bound)
+                   for key, value in ce.items()
+                   if not Fact.is_special(key))
+    elif isinstance(ce, W):
+        if ce.__bind__ is None:
+            return 0
+        elif ce.__bind__ in bound:
+            return 1
+        else:
+            bound.add(ce.__bind__)
+            return 0
+    elif isinstance(ce, (L, P)):
+        if ce.__bind__ is not None:
+            bound.add(ce.__bind__)
+        return 1
+    elif isinstance(ce, TEST):
+        return 1
+    elif isinstance(ce, OR):
+        return max((get_specificity(branch, set(bound)) for branch in ce),
+                   default=0)
+    elif isinstance(ce, tuple):
+        return sum(get_specificity(e, bound) for e in ce)
+    else:
+        return 1
+
+
+class LEXStrategy(HeapStrategy):
+    """
+    CLIPS `lex` strategy.
+
+    Inside a salience level, activations are compared by the ids of
+    their facts, most recent first; when all of them are equal, the
+    activation with more facts goes first.
+
+    """
+    def get_key(self, activation):
+        return (activation.rule.salience, get_recency(activation))
+
+
+class MEAStrategy(HeapStrategy):
+    """
+    CLIPS `mea` strategy.
+
+    Inside a salience level, the activation whose fact matching the
+    first pattern of the rule is the most recent goes first. Ties are
+    resolved like `LEXStrategy`.
+
+    The fact matching the first pattern is the one captured by that
+    pattern in the context of the activation.
+
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.first_captures = dict()
+
+    def get_key(self, activation):
+        rule = activation.rule
+        try:
+            names = self.first_captures[rule]
+        except KeyError:
+            names = self.first_captures[rule] = get_first_captures(rule)
+
+        context = activation.context
+        first = 0
+        for name in names:
+            if name in context:
+                first = max(first, context[name]['__factid__'])
+
+        return (rule.salience, first, get_recency(activation))
+
+
+class SimplicityStrategy(HeapStrategy):
+    """
+    CLIPS `simplicity` strategy.
+
+    Inside a salience level, new activations are placed above the ones
+    of rules with the same or higher specificity (number of tests, see
+    `get_specificity`).
+
+    """
+    #: 1 to prefer the simplest rules, -1 the most complex ones.
+    direction = 1
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.specificities = dict()
+
+    def get_key(self, activation):
+        rule = activation.rule
+        try:
+            specificity = self.specificities[rule]
+        except KeyError:
+            specificity = self.specificities[rule] = get_specificity(rule)
+
+        return (rule.salience, -self.direction * specificity)
+
+
+class ComplexityStrategy(SimplicityStrategy):
+    """
+    CLIPS `complexity` strategy.
+
+    Inside a salience level, new activations are placed above the ones
+    of rules with the same or lower specificity.
+
+    """
+    direction = -1
+
+
+class RandomStrategy(HeapStrategy):
+    """
+    CLIPS `random` strategy.
+
+    Inside a salience level, activations are run in a random order: a
+    random number, drawn from a generator initialized with `seed`, is
+    assigned to every activation added to the agenda.
+
+    """
+    def __init__(self, *args, seed=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.random = random.Random(seed)
+
+    def get_key(self, activation):
+        return (activation.rule.salience, self.random.random())
+
     def _update_agenda(self, agenda, added, removed):
         for act in added:
-            act.key = self.get_key(act)
-            bisect.insort_left(agenda.activations, act)
+            if act.key is None:
+                act.key = self.get_key(act)
+            agenda.add(act)
 
+        # The `HeapAgenda` finds the activations to remove without their
+        # keys (which would be different random numbers).
         for act in removed:
-            try:
-                act.key = self.get_key(act)
-                idx = bisect.bisect_left(agenda.activations, act)
-                if agenda.activations[idx] == act:
-                    del agenda.activations[idx]
-                elif agenda.activations[idx + 1] == act:
-                    del agenda.activations[idx + 1]
-            except IndexError:
-                # Already executed rule.
-                pass
+            agenda.remove(act)
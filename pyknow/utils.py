@@ -22,24 +22,62 @@ def freeze(obj):
              "own freeze method") % (obj, type(obj)))
 
 
+def _is_frozen(obj):
+    """
+    Return True if the frozen container `obj` only holds frozen values.
+
+    A frozen container can still hold mutable values (for example
+    ``frozendict(a=[1])``); these are not hashable, so they are rebuilt
+    with their values frozen.
+
+    """
+    try:
+        hash(obj)
+    except TypeError:
+        return False
+    else:
+        return True
+
+
 @freeze.register(dict)
-@freeze.register(frozendict)
 def freeze_dict(obj):
     return frozendict((k, freeze(v)) for k, v in obj.items())
 
 
+@freeze.register(frozendict)
+def freeze_frozendict(obj):
+    if _is_frozen(obj):
+        return obj
+    else:
+        return freeze_dict(obj)
+
+
 @freeze.register(list)
-@freeze.register(frozenlist)
 def freeze_list(obj):
     return frozenlist(freeze(v) for v in obj)
 
 
+@freeze.register(frozenlist)
+def freeze_frozenlist(obj):
+    if _is_frozen(obj):
+        return obj
+    else:
+        return freeze_list(obj)
+
+
 @freeze.register(set)
-@freeze.register(frozenset)
 def freeze_set(obj):
     return frozenset(freeze(v) for v in obj)
 
 
+@freeze.register(frozenset)
+def freeze_frozenset(obj):
+    if _is_frozen(obj):
+        return obj
+    else:
+        return freeze_set(obj)
+
+
 @singledispatch
 def unfreeze(obj):
     return obj
@@ -0,0 +1,122 @@
+"""
+Compilation of `Field` schemas to plain checks.
+
+`compile_schema` translates the most common schema definitions to
+functions returning whether a (frozen) value is valid, without building
+`Schema` objects or unfreezing the value when it is not a container.
+The result is the same as validating the unfrozen value with `Schema`.
+
+"""
+import schema
+
+from pyknow.utils import frozendict, frozenlist, unfreeze
+
+
+#: Types of the values changed by `unfreeze`.
+CONTAINERS = (dict, frozendict, list, frozenlist, set, frozenset)
+
+#: Type of the result of `unfreeze` for the frozen containers.
+UNFROZEN_TYPES = {frozendict: dict, frozenlist: list, frozenset: set}
+
+
+def _unfreeze(data):
+    if isinstance(data, CONTAINERS):
+        return unfreeze(data)
+    else:
+        return data
+
+
+def _unfrozen_type(data):
+    try:
+        return UNFROZEN_TYPES[type(data)]
+    except KeyError:
+        return type(_unfreeze(data))
+
+
+def _compile_type(definition):
+    def _check(data):
+        if isinstance(data, CONTAINERS):
+            return issubclass(_unfrozen_type(data), definition)
+        return isinstance(data, definition)
+    return _check
+
+
+def _compile_callable(definition):
+    def _check(data):
+        try:
+            return bool(definition(_unfreeze(data)))
+        except Exception:
+            return False
+    return _check
+
+
+def _compile_comparable(definition):
+    def _check(data):
+        return definition == _unfreeze(data)
+    return _check
+
+
+def _compile_iterable(definition):
+    container = type(definition)
+    elements = _compile_or(definition)
+    if elements is None:
+        return None
+
+    def _check(data):
+        # The elements of the frozen containers are checked frozen.
+        if type(data) not in UNFROZEN_TYPES:
+            data = _unfreeze(data)
+        return (issubclass(_unfrozen_type(data), container)
+                and all(elements(element) for element in data))
+    return _check
+
+
+def _compile_or(definitions):
+    checks = [compile_schema(d) for d in definitions]
+    if any(check is None for check in checks):
+        return None
+
+    def _check(data):
+        return any(check(data) for check in checks)
+    return _check
+
+
+def _compile_and(definitions):
+    checks = [compile_schema(d) for d in definitions]
+    if any(check is None for check in checks):
+        return None
+
+    def _check(data):
+        return all(check(data) for check in checks)
+    return _check
+
+
+def compile_schema(definition):
+    """
+    Return a function checking the values valid for the schema
+    `definition`, or `None` if it can't be compiled.
+
+    Types, callables, literal values, `schema.Or` and `schema.And` of
+    them, `schema.Schema` (and `schema.Optional`) wrapping them and
+    lists, tuples and sets of them are compiled. Dictionaries and any
+    other validator (like `schema.Use`, which changes the data) are not.
+
+    """
+    if type(definition) in (list, tuple, set, frozenset):
+        return _compile_iterable(definition)
+    elif type(definition) is dict:
+        return None
+    elif issubclass(type(definition), type):
+        return _compile_type(definition)
+    elif type(definition) in (schema.Schema, schema.Optional):
+        return compile_schema(definition._schema)
+    elif type(definition) is schema.Or:
+        return _compile_or(definition._args)
+    elif type(definition) is schema.And:
+        return _compile_and(definition._args)
+    elif hasattr(definition, 'validate'):
+        return None
+    elif callable(definition):
+        return _compile_callable(definition)
+    else:
+        return _compile_comparable(definition)
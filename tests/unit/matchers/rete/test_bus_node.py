@@ -67,3 +67,115 @@ def test_busnode_remove(TestNode):
 
     assert tn1.added == [Token.invalid(Fact())]
     assert tn2.added == [Token.invalid(Fact())]
+
+
+def test_busnode_dispatch_by_fact_type(TestNode):
+    from pyknow.matchers.rete.nodes import BusNode, FeatureTesterNode
+    from pyknow.matchers.rete.check import TypeCheck
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    class A(Fact):
+        pass
+
+    class B(Fact):
+        pass
+
+    bn = BusNode()
+    any_tn = TestNode()
+    bn.add_child(any_tn, any_tn.activate)
+
+    type_tns = dict()
+    for fact_type in (A, B):
+        ftn = FeatureTesterNode(TypeCheck(fact_type))
+        tn = TestNode()
+        ftn.add_child(tn, tn.activate)
+        bn.add_child(ftn, ftn.activate)
+        type_tns[fact_type] = tn
+
+    bn.add(A())
+    bn.remove(B())
+
+    assert any_tn.added == [Token.valid(A()), Token.invalid(B())]
+    assert type_tns[A].added == [Token.valid(A())]
+    assert type_tns[B].added == [Token.invalid(B())]
+    assert len(bn.get_children(A)) == 2
+
+
+def test_busnode_dispatch_table_is_invalidated_by_add_child(TestNode):
+    from pyknow.matchers.rete.nodes import BusNode
+    from pyknow.fact import Fact
+
+    bn = BusNode()
+    tn1 = TestNode()
+    tn2 = TestNode()
+
+    bn.add_child(tn1, tn1.activate)
+    bn.add(Fact())
+    bn.add_child(tn2, tn2.activate)
+    bn.add(Fact())
+
+    assert len(tn1.added) == 2
+    assert len(tn2.added) == 1
+
+
+def test_busnode_dispatch_subclasses_when_enabled(TestNode):
+    from pyknow.matchers.rete.nodes import BusNode, FeatureTesterNode
+    from pyknow.matchers.rete.check import TypeCheck
+    from pyknow.fact import Fact
+
+    class Strict(Fact):
+        pass
+
+    class StrictChild(Strict):
+        pass
+
+    class Loose(Fact):
+        __match_subclasses__ = True
+
+    class LooseChild(Loose):
+        pass
+
+    bn = BusNode()
+    tns = dict()
+    for fact_type in (Strict, Loose):
+        ftn = FeatureTesterNode(TypeCheck(fact_type))
+        tn = TestNode()
+        ftn.add_child(tn, tn.activate)
+        bn.add_child(ftn, ftn.activate)
+        tns[fact_type] = tn
+
+    bn.add(StrictChild())
+    bn.add(LooseChild())
+
+    assert tns[Strict].added == []
+    assert len(tns[Loose].added) == 1
+
+
+def test_busnode_add_batch_by_type(TestNode):
+    from pyknow.matchers.rete.nodes import BusNode
+    from pyknow.matchers.rete.nodes import FeatureTesterNode
+    from pyknow.matchers.rete.check import TypeCheck
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    class A(Fact):
+        pass
+
+    class B(Fact):
+        pass
+
+    bn = BusNode()
+    testers = dict()
+    for fact_type in (A, B):
+        ftn = FeatureTesterNode(TypeCheck(fact_type))
+        tn = TestNode()
+        ftn.add_child(tn, tn.activate)
+        bn.add_child(ftn, ftn.activate)
+        testers[fact_type] = tn
+
+    bn.add_batch([A(x=1), B(x=2), A(x=3)])
+    bn.remove_batch([B(x=2)])
+
+    assert testers[A].added == [Token.valid(A(x=1)), Token.valid(A(x=3))]
+    assert testers[B].added == [Token.valid(B(x=2)), Token.invalid(B(x=2))]
@@ -292,3 +292,87 @@ def test_featurecheck_call_or():
     assert not check(Fact('mydata'))
     check = FeatureCheck(0, L('otherdata') | ~L('mydata'))
     assert not check(Fact('mydata'))
+
+
+def test_typecheck_exact_type_by_default():
+    from pyknow.matchers.rete.check import TypeCheck
+    from pyknow import Fact
+
+    class Base(Fact):
+        pass
+
+    class Derived(Base):
+        pass
+
+    assert TypeCheck(Base)(Base())
+    assert not TypeCheck(Base)(Derived())
+    assert not TypeCheck(Derived)(Base())
+
+
+def test_typecheck_subclasses_when_enabled():
+    from pyknow.matchers.rete.check import TypeCheck
+    from pyknow import Fact
+
+    class Base(Fact):
+        __match_subclasses__ = True
+
+    class Derived(Base):
+        pass
+
+    assert TypeCheck(Base)(Base())
+    assert TypeCheck(Base)(Derived())
+    assert not TypeCheck(Base)(Fact())
+    assert not TypeCheck(Derived)(Base())
+
+
+def test_samecontextcheck_is_interned():
+    from pyknow.matchers.rete.check import SameContextCheck
+
+    assert SameContextCheck() is SameContextCheck()
+
+
+def test_joincheck_is_interned():
+    from pyknow.matchers.rete.check import JoinCheck
+
+    assert JoinCheck(['a', 'b']) is JoinCheck(('b', 'a'))
+    assert JoinCheck(['a']) is not JoinCheck()
+
+
+def test_joincheck_compare_shared_variables():
+    from pyknow.matchers.rete.check import JoinCheck
+
+    check = JoinCheck()
+
+    assert check({'a': 1, 'b': 2}, {'a': 1, 'c': 3})
+    assert not check({'a': 1, 'b': 2}, {'a': 2, 'c': 3})
+    assert check({'a': 1}, {(False, 'a'): 2})
+    assert not check({'a': 1}, {(False, 'a'): 1})
+
+
+def test_joincheck_dont_compare_join_on_variables():
+    from pyknow.matchers.rete.check import JoinCheck
+
+    # Join variables are guaranteed equal by the indexed memories.
+    check = JoinCheck(['a'])
+
+    assert check({'a': 1, 'b': 2}, {'a': 2, 'b': 2})
+    assert not check({'a': 1, 'b': 2}, {'a': 1, 'b': 3})
+
+
+def test_joincheck_compare_facts_by_identity():
+    from pyknow.matchers.rete.check import JoinCheck
+    from pyknow import Fact
+
+    check = JoinCheck()
+    f1 = Fact(a=1)
+    f2 = Fact(a=1)
+
+    assert check({'f': f1}, {'f': f1})
+    assert not check({'f': f1}, {'f': f2})
+
+
+def test_joincheck_negated_value_before_capture():
+    from pyknow.matchers.rete.check import JoinCheck
+
+    with pytest.raises(RuntimeError):
+        JoinCheck()({(False, 'a'): 1}, {'a': 1})
@@ -88,3 +88,56 @@ def test_conflictsetchange_get_activations_data():
     assert list(added)[0].rule is rule
     assert f in list(added)[0].facts
     assert list(added)[0].context == {'data': 'test'}
+
+
+def test_conflictsetchange_registers_in_dirty():
+    from pyknow.fact import Fact
+    from pyknow.matchers.rete.nodes import ConflictSetNode
+    from pyknow.matchers.rete.token import Token
+    from pyknow.rule import Rule
+
+    csn = ConflictSetNode(Rule())
+    csn.dirty = dict()
+
+    f = Fact(test='data')
+    f.__factid__ = 1
+
+    csn.activate(Token.invalid(f))
+    assert not csn.dirty
+
+    csn.activate(Token.valid(f))
+    assert list(csn.dirty) == [csn]
+
+    csn.dirty.clear()
+    csn.activate(Token.valid(f))
+    assert not csn.dirty
+
+
+def test_conflictsetchange_cancelled_tokens_dont_create_activations(
+        monkeypatch):
+    from pyknow.fact import Fact
+    from pyknow.matchers.rete import nodes
+    from pyknow.matchers.rete.token import Token
+    from pyknow.rule import Rule
+
+    created = []
+
+    class Activation(nodes.Activation):
+        __slots__ = ()
+
+        def __init__(self, *args, **kwargs):
+            created.append(args)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(nodes, 'Activation', Activation)
+
+    csn = nodes.ConflictSetNode(Rule())
+
+    f = Fact(first=1)
+    f.__factid__ = 1
+
+    csn.activate(Token.valid(f, {'data': 'test'}))
+    csn.activate(Token.invalid(f, {'data': 'test'}))
+
+    assert csn.get_activations() == ([], [])
+    assert not created
@@ -435,3 +435,60 @@ def test_nested_values_dict_and_lists():
 
     p1 = ke.declare(Fact(key=[{"with": {"nested": [{"other": 1}, {"dicts": 1}]}}]))
     assert len(ke.agenda.activations) == 1
+
+
+def test_EXISTS_and_FORALL_use_native_nodes():
+    from pyknow import KnowledgeEngine, Rule, Fact, EXISTS, FORALL, W
+    from pyknow.matchers.rete.nodes import ExistsNode, ForallNode, NotNode
+
+    class KE(KnowledgeEngine):
+        @Rule(EXISTS(Fact(a=1)))
+        def r1(self):
+            pass
+
+        @Rule(FORALL(Fact(key_a=W('k')), Fact(key_b=W('k'))))
+        def r2(self):
+            pass
+
+    ke = KE()
+
+    nodes = set()
+
+    def _find(node):
+        nodes.add(type(node))
+        for child in node.children:
+            _find(child.node)
+
+    _find(ke.matcher.root_node)
+
+    assert ExistsNode in nodes
+    assert ForallNode in nodes
+    assert NotNode not in nodes
+
+
+def test_EXISTS_retraction():
+    from pyknow import KnowledgeEngine, Rule, Fact, EXISTS
+
+    executed = 0
+
+    class Test(KnowledgeEngine):
+        @Rule(EXISTS(Fact(a=1)))
+        def any_fact_once(self):
+            nonlocal executed
+            executed += 1
+
+    t = Test()
+    t.reset()
+    f1 = t.declare(Fact(a=1, b=1))
+    f2 = t.declare(Fact(a=1, b=2))
+    assert len(t.agenda.activations) == 1
+
+    t.retract(f1)
+    assert len(t.agenda.activations) == 1
+
+    t.retract(f2)
+    assert len(t.agenda.activations) == 0
+
+    t.declare(Fact(a=1, b=3))
+    t.run()
+    assert executed == 1
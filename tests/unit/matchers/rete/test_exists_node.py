@@ -0,0 +1,75 @@
+import pytest
+
+
+def test_existsnode_exists():
+    try:
+        from pyknow.matchers.rete.nodes import ExistsNode
+    except ImportError as exc:
+        assert False, exc
+
+
+def test_existsnode_is_abstractnode():
+    from pyknow.matchers.rete.nodes import ExistsNode
+    from pyknow.matchers.rete.abstract import TwoInputNode
+
+    assert issubclass(ExistsNode, TwoInputNode)
+
+
+def test_existsnode_left_activate_valid_empty_right(TestNode):
+    from pyknow.matchers.rete.nodes import ExistsNode
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    en = ExistsNode(lambda l, r: True)
+    tn = TestNode()
+    en.add_child(tn, tn.activate)
+
+    token = Token.valid(Fact(test='data'))
+    en.activate_left(token)
+
+    assert not tn.added
+    assert en.left_memory[token.to_info()] == 0
+
+
+def test_existsnode_left_activate_valid_matching(TestNode):
+    from pyknow.matchers.rete.nodes import ExistsNode
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    en = ExistsNode(lambda l, r: True)
+    en.right_memory.append(Token.valid(Fact(test='data1')).to_info())
+    en.right_memory.append(Token.valid(Fact(test='data2')).to_info())
+    tn = TestNode()
+    en.add_child(tn, tn.activate)
+
+    token = Token.valid(Fact(test='data'))
+    en.activate_left(token)
+
+    assert tn.added == [token]
+    assert en.left_memory[token.to_info()] == 2
+
+
+def test_existsnode_only_emit_when_count_crosses_zero(TestNode):
+    from pyknow.matchers.rete.nodes import ExistsNode
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    en = ExistsNode(lambda l, r: True)
+    tn = TestNode()
+    en.add_child(tn, tn.activate)
+
+    left = Token.valid(Fact(left=True))
+    en.activate_left(left)
+
+    for i in range(3):
+        en.activate_right(Token.valid(Fact(right=i)))
+    assert tn.added == [Token.valid(Fact(left=True))]
+
+    for i in range(3):
+        en.activate_right(Token.invalid(Fact(right=i)))
+    assert tn.added == [Token.valid(Fact(left=True)),
+                        Token.invalid(Fact(left=True))]
+
+    en.activate_left(Token.invalid(Fact(left=True)))
+    assert len(tn.added) == 2
+    assert not en.left_memory
@@ -0,0 +1,127 @@
+import pytest
+
+
+def test_featureswitchnode_exists():
+    try:
+        from pyknow.matchers.rete.nodes import FeatureSwitchNode
+    except ImportError as exc:
+        assert False, exc
+
+
+def test_featureswitchnode_is_oneinputnode():
+    from pyknow.matchers.rete.nodes import FeatureSwitchNode
+    from pyknow.matchers.rete.abstract import OneInputNode
+
+    assert issubclass(FeatureSwitchNode, OneInputNode)
+
+
+def test_featureswitchnode_only_accepts_literal_testers(TestNode):
+    from pyknow.matchers.rete.nodes import FeatureSwitchNode
+    from pyknow.matchers.rete.nodes import FeatureTesterNode
+    from pyknow.matchers.rete.check import FeatureCheck
+    from pyknow import P
+
+    fsn = FeatureSwitchNode('kind')
+
+    # MUST NOT RAISE
+    ftn = FeatureTesterNode(FeatureCheck('kind', 'x'))
+    fsn.add_child(ftn, ftn.activate)
+
+    with pytest.raises(TypeError):
+        tn = TestNode()
+        fsn.add_child(tn, tn.activate)
+
+    with pytest.raises(TypeError):
+        ftn = FeatureTesterNode(FeatureCheck('other', 'x'))
+        fsn.add_child(ftn, ftn.activate)
+
+    with pytest.raises(TypeError):
+        ftn = FeatureTesterNode(FeatureCheck('kind', P(lambda _: True)))
+        fsn.add_child(ftn, ftn.activate)
+
+
+def test_featureswitchnode_dispatch_to_matching_branch(TestNode):
+    from pyknow.matchers.rete.nodes import FeatureSwitchNode
+    from pyknow.matchers.rete.nodes import FeatureTesterNode
+    from pyknow.matchers.rete.check import FeatureCheck
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    fsn = FeatureSwitchNode('kind')
+    branches = dict()
+    for value in ('x', 'y', 'z'):
+        ftn = FeatureTesterNode(FeatureCheck('kind', value))
+        tn = TestNode()
+        ftn.add_child(tn, tn.activate)
+        fsn.add_child(ftn, ftn.activate)
+        branches[value] = tn
+
+    token = Token.valid(Fact(kind='y'))
+    fsn.activate(token)
+
+    assert branches['x'].added == []
+    assert branches['y'].added == [token]
+    assert branches['z'].added == []
+
+    fsn.activate(Token.valid(Fact(kind='other')))
+    fsn.activate(Token.valid(Fact(other='y')))
+
+    assert branches['y'].added == [token]
+
+
+def test_featureswitchnode_branch_dont_call_other_checks(monkeypatch):
+    from pyknow.matchers.rete.nodes import FeatureSwitchNode
+    from pyknow.matchers.rete.nodes import FeatureTesterNode
+    from pyknow.matchers.rete.check import FeatureCheck
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    fsn = FeatureSwitchNode('kind')
+    for i in range(100):
+        ftn = FeatureTesterNode(FeatureCheck('kind', i))
+        fsn.add_child(ftn, ftn.activate)
+
+    called = []
+    original = FeatureCheck.__call__
+
+    def _call(self, *args, **kwargs):
+        called.append(self)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(FeatureCheck, '__call__', _call)
+
+    fsn.activate(Token.valid(Fact(kind=42)))
+
+    assert called == [FeatureCheck('kind', 42)]
+
+
+def test_retematcher_groups_literals_in_switch():
+    from pyknow import KnowledgeEngine, Rule, Fact
+    from pyknow.matchers.rete.nodes import FeatureSwitchNode
+
+    executed = []
+
+    KE = type('KE', (KnowledgeEngine, ),
+              {'r%d' % i: Rule(Fact(kind=i))(
+                  lambda self, i=i: executed.append(i))
+               for i in range(10)})
+
+    ke = KE()
+
+    switches = []
+
+    def _find(node):
+        if isinstance(node, FeatureSwitchNode):
+            switches.append(node)
+        for child in node.children:
+            _find(child.node)
+
+    _find(ke.matcher.root_node)
+    assert len(switches) == 1
+    assert set(switches[0].branches) == set(range(10))
+
+    ke.reset()
+    ke.declare(Fact(kind=3), Fact(kind=7), Fact(kind=12))
+    ke.run()
+
+    assert sorted(executed) == [3, 7]
@@ -79,8 +79,7 @@ def test_featuretesternode_pass_when_callable_adds_context(TestNode):
 
     ftn.activate(token)
 
-    newtoken = token.copy()
-    newtoken.context['something'] = True
+    newtoken = Token.valid(Fact(test=True), {'something': True})
 
     assert tn1.added == tn2.added == [newtoken]
 
@@ -101,8 +100,7 @@ def test_featuretesternode_pass_when_callable_modify_context(TestNode):
 
     ftn.activate(token)
 
-    newtoken = token.copy()
-    newtoken.context['something'] = True
+    newtoken = Token.valid(Fact(test=True), {'something': True})
 
     assert tn1.added == tn2.added == []
 
@@ -123,8 +121,7 @@ def test_featuretesternode_pass_when_callable_dont_modify_context(TestNode):
 
     ftn.activate(token)
 
-    newtoken = token.copy()
-    newtoken.context['something'] = True
+    newtoken = Token.valid(Fact(test=True), {'something': True})
 
     assert tn1.added == tn2.added == [newtoken]
 
@@ -0,0 +1,67 @@
+import pytest
+
+
+def test_forallnode_exists():
+    try:
+        from pyknow.matchers.rete.nodes import ForallNode
+    except ImportError as exc:
+        assert False, exc
+
+
+def test_forallnode_is_abstractnode():
+    from pyknow.matchers.rete.nodes import ForallNode
+    from pyknow.matchers.rete.abstract import TwoInputNode
+
+    assert issubclass(ForallNode, TwoInputNode)
+    assert hasattr(ForallNode, 'activate_leader')
+
+
+def test_forallnode_pass_left_without_leaders(TestNode):
+    from pyknow.matchers.rete.nodes import ForallNode
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    fn = ForallNode(lambda l, r: True)
+    tn = TestNode()
+    fn.add_child(tn, tn.activate)
+
+    token = Token.valid(Fact(owner=True))
+    fn.activate_left(token)
+
+    assert tn.added == [token]
+
+
+def test_forallnode_unmatched_leaders_block_left(TestNode):
+    from pyknow.matchers.rete.nodes import ForallNode
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    fn = ForallNode(lambda l, r: l['k'] == r['k'], join_on=['k'])
+    tn = TestNode()
+    fn.add_child(tn, tn.activate)
+
+    owner = Token.valid(Fact(owner=True))
+    fn.activate_left(owner)
+    assert tn.added == [owner]
+
+    fn.activate_leader(Token.valid(Fact(leader=1), {'k': 1}))
+    fn.activate_leader(Token.valid(Fact(leader=2), {'k': 2}))
+    assert fn.unmatched == 2
+    assert tn.added == [owner, Token.invalid(Fact(owner=True))]
+
+    fn.activate_right(Token.valid(Fact(follower=1), {'k': 1}))
+    assert fn.unmatched == 1
+    assert len(tn.added) == 2
+
+    fn.activate_right(Token.valid(Fact(follower=2), {'k': 2}))
+    assert fn.unmatched == 0
+    assert tn.added[2:] == [owner]
+
+    fn.activate_leader(Token.invalid(Fact(leader=2), {'k': 2}))
+    fn.activate_right(Token.invalid(Fact(follower=2), {'k': 2}))
+    assert fn.unmatched == 0
+    assert len(tn.added) == 3
+
+    fn.activate_right(Token.invalid(Fact(follower=1), {'k': 1}))
+    assert fn.unmatched == 1
+    assert tn.added[3:] == [Token.invalid(Fact(owner=True))]
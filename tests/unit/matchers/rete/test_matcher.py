@@ -83,3 +83,158 @@ def test_retematcher_changes_return_activations_if_csn():
 
     assert len(added) == 2
     assert all(isinstance(a, Activation) for a in added)
+
+
+def test_retematcher_joins_are_indexed_by_shared_variables():
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+    from pyknow.matchers.rete.nodes import OrdinaryMatchNode
+
+    class KE(KnowledgeEngine):
+        @Rule(Fact(order=W('id'), customer=W('customer')),
+              Fact(customer=W('customer'), name=W('name')))
+        def r1(self):
+            pass
+
+    ke = KE()
+
+    joins = []
+
+    def _find(node):
+        if isinstance(node, OrdinaryMatchNode) and node not in joins:
+            joins.append(node)
+        for child in node.children:
+            _find(child.node)
+
+    _find(ke.matcher.root_node)
+
+    assert [j.join_on for j in joins] == [('customer', )]
+
+
+def test_retematcher_shares_common_join_prefixes():
+    from pyknow import KnowledgeEngine, Rule, Fact, W, NOT
+    from pyknow.matchers.rete.nodes import ConflictSetNode
+    from pyknow.matchers.rete.nodes import OrdinaryMatchNode
+    from pyknow.matchers.rete.nodes import NotNode
+
+    class Order(Fact):
+        pass
+
+    class Customer(Fact):
+        pass
+
+    class Blocked(Fact):
+        pass
+
+    executed = []
+
+    class KE(KnowledgeEngine):
+        @Rule(Order(customer=W('c')),
+              Customer(id=W('c')),
+              NOT(Blocked(customer=W('c'))))
+        def r1(self):
+            executed.append('r1')
+
+        @Rule(Order(customer=W('c')),
+              Customer(id=W('c')),
+              NOT(Blocked(customer=W('c'))),
+              Fact(flag=True))
+        def r2(self):
+            executed.append('r2')
+
+        @Rule(Order(customer=W('c')),
+              Customer(id=W('c')))
+        def r3(self):
+            executed.append('r3')
+
+    ke = KE()
+
+    nodes = []
+
+    def _find(node):
+        if node not in nodes:
+            nodes.append(node)
+        for child in node.children:
+            _find(child.node)
+
+    _find(ke.matcher.root_node)
+
+    def _count(node_cls):
+        return len([n for n in nodes if isinstance(n, node_cls)])
+
+    assert _count(OrdinaryMatchNode) == 2
+    assert _count(NotNode) == 1
+    assert _count(ConflictSetNode) == 3
+
+    ke.reset()
+    ke.declare(Order(customer=1), Customer(id=1), Fact(flag=True))
+    ke.run()
+
+    assert sorted(executed) == ['r1', 'r2', 'r3']
+
+
+def test_retematcher_changes_only_visit_dirty_nodes():
+    from pyknow import KnowledgeEngine, Rule, Fact
+    from pyknow.matchers.rete.nodes import ConflictSetNode
+
+    class KE(KnowledgeEngine):
+        @Rule(Fact(a=1))
+        def r1(self):
+            pass
+
+        @Rule(Fact(a=2))
+        def r2(self):
+            pass
+
+    ke = KE()
+    ke.reset()
+
+    visited = []
+    csns = ke.matcher._get_conflict_set_nodes()
+    for csn in csns:
+        def get_activations(csn=csn, method=csn.get_activations):
+            visited.append(csn.rule)
+            return method()
+        csn.get_activations = get_activations
+
+    ke.declare(Fact(a=1))
+
+    assert visited == [ke.agenda.activations[0].rule]
+    assert not ke.matcher.dirty_nodes
+
+    visited.clear()
+    ke.declare(Fact(b=1))
+    assert not visited
+
+
+def test_retematcher_modify_only_reaches_patterns_testing_the_keys(
+        TestNode):
+    from pyknow import KnowledgeEngine, Fact, L
+    from pyknow.matchers.rete import ReteMatcher
+    from pyknow.matchers.rete.check import FeatureCheck
+    from pyknow.matchers.rete.nodes import FeatureTesterNode
+    from pyknow.matchers.rete.token import Token
+
+    matcher = ReteMatcher(KnowledgeEngine())
+    status = FeatureTesterNode(FeatureCheck('status', L('open')))
+    name = FeatureTesterNode(FeatureCheck('name', L('x')))
+    tn_status = TestNode()
+    tn_name = TestNode()
+
+    matcher.root_node.add_child(status, status.activate)
+    matcher.root_node.add_child(name, name.activate)
+    status.add_child(tn_status, tn_status.activate)
+    name.add_child(tn_name, tn_name.activate)
+
+    fact = Fact(status='open', name='x', __factid__=1)
+    matcher.changes(adding=[fact])
+    assert tn_status.added == tn_name.added == [Token.valid(fact)]
+
+    def update():
+        dict.__setitem__(fact, 'status', 'closed')
+
+    steps = matcher.modify(fact, ['status'], update)
+
+    assert steps == [([], []), ([], [])]
+    assert fact['status'] == 'closed'
+    assert tn_status.added == [Token.valid(fact), Token.invalid(fact)]
+    assert tn_name.added == [Token.valid(fact)]
@@ -0,0 +1,137 @@
+import pytest
+
+
+def test_betamemory_exists():
+    try:
+        from pyknow.matchers.rete.memory import BetaMemory
+    except ImportError as exc:
+        assert False, exc
+
+
+def test_betamemory_behaves_like_a_list_without_join_variables():
+    from pyknow.matchers.rete.memory import BetaMemory
+    from pyknow.matchers.rete.token import TokenInfo
+    from pyknow.fact import Fact
+
+    bm = BetaMemory()
+    assert not bm
+
+    i1 = TokenInfo([Fact(1)], {'a': 1})
+    i2 = TokenInfo([Fact(2)], {'a': 2})
+
+    bm.append(i1)
+    bm.append(i2)
+
+    assert len(bm) == 2
+    assert list(bm) == [i1, i2]
+    assert i1 in bm
+
+    bm.remove(i1)
+    assert list(bm) == [i2]
+    assert i1 not in bm
+
+    with pytest.raises(ValueError):
+        bm.remove(i1)
+
+
+def test_betamemory_keeps_repeated_tokens():
+    from pyknow.matchers.rete.memory import BetaMemory
+    from pyknow.matchers.rete.token import TokenInfo
+    from pyknow.fact import Fact
+
+    bm = BetaMemory()
+    info = TokenInfo([Fact(1)], {})
+
+    bm.append(info)
+    bm.append(info)
+    assert list(bm) == [info, info]
+
+    bm.remove(info)
+    assert list(bm) == [info]
+
+
+def test_betamemory_indexed_by_join_variables():
+    from pyknow.matchers.rete.memory import BetaMemory
+    from pyknow.matchers.rete.token import TokenInfo
+    from pyknow.fact import Fact
+
+    bm = BetaMemory(join_on=['a'])
+
+    infos = [TokenInfo([Fact(i)], {'a': i % 3, 'b': i}) for i in range(9)]
+    for info in infos:
+        bm.append(info)
+
+    assert len(bm) == 9
+    assert list(bm.get(bm.get_key({'a': 1}))) == infos[1::3]
+    assert list(bm.get(bm.get_key({'a': 5}))) == []
+
+    bm.remove(infos[4])
+    assert list(bm.get((1, ))) == [infos[1], infos[7]]
+    assert infos[4] not in bm
+    assert infos[7] in bm
+
+
+def test_countermemory_exists():
+    try:
+        from pyknow.matchers.rete.memory import CounterMemory
+    except ImportError as exc:
+        assert False, exc
+
+
+def test_countermemory_behaves_like_a_dict():
+    from pyknow.matchers.rete.memory import CounterMemory
+    from pyknow.matchers.rete.token import TokenInfo
+    from pyknow.fact import Fact
+
+    cm = CounterMemory()
+    info = TokenInfo([Fact(1)], {'a': 1})
+
+    cm[info] = 2
+    assert info in cm
+    assert cm[info] == 2
+    assert list(cm) == [info]
+
+    cm[info] = 0
+    assert cm[info] == 0
+    assert len(cm) == 1
+
+    del cm[info]
+    assert info not in cm
+    assert not cm
+
+
+def test_countermemory_indexed_by_join_variables():
+    from pyknow.matchers.rete.memory import CounterMemory
+    from pyknow.matchers.rete.token import TokenInfo
+    from pyknow.fact import Fact
+
+    cm = CounterMemory(join_on=['a'])
+
+    infos = [TokenInfo([Fact(i)], {'a': i % 3}) for i in range(6)]
+    for idx, info in enumerate(infos):
+        cm[info] = idx
+
+    assert cm.get((2, )) == [(infos[2], 2), (infos[5], 5)]
+    assert cm.pop(infos[2]) == 2
+    assert cm.get((2, )) == [(infos[5], 5)]
+    assert cm.get((7, )) == []
+
+
+def test_lineage_pop_forgets_both_sides():
+    from pyknow.matchers.rete.memory import Lineage
+
+    lineage = Lineage()
+    lineage.add('l1', 'r1', 'l1r1')
+    lineage.add('l1', 'r2', 'l1r2')
+    lineage.add('l2', 'r1', 'l2r1')
+    assert len(lineage) == 3
+
+    assert lineage.pop_right('r1') == {'l1': 'l1r1', 'l2': 'l2r1'}
+    assert len(lineage) == 1
+    assert 'l2' not in lineage.left
+
+    assert lineage.pop_left('l1') == {'r2': 'l1r2'}
+    assert not lineage
+    assert not lineage.right
+
+    assert lineage.pop_left('l1') == {}
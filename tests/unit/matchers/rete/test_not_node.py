@@ -126,6 +126,7 @@ def test_notnode_right_activate_invalid_match_more_than_one(TestNode):
 
     nn.right_memory.append(token.to_info())
     nn.left_memory[token.to_info()] = 2
+    nn.lineage.add(token.to_info(), token.to_info())
 
     nn.activate_right(token)
 
@@ -150,6 +151,7 @@ def test_notnode_right_activate_invalid_match_just_one(TestNode):
 
     nn.right_memory.append(token.to_info())
     nn.left_memory[token.to_info()] = 1
+    nn.lineage.add(token.to_info(), token.to_info())
 
     nn.activate_right(token)
 
@@ -202,3 +204,67 @@ def test_notnode_right_activate_valid_match_just_one(TestNode):
     assert Token.invalid(Fact(test='data')) in tn1.added
     assert Token.invalid(Fact(test='data')) in tn2.added
     assert nn.left_memory[token.to_info()] == 1
+
+
+def test_notnode_only_count_same_join_values(TestNode):
+    from pyknow.matchers.rete.nodes import NotNode
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    calls = []
+
+    def matcher(left, right):
+        calls.append((left['x'], right['x']))
+        return True
+
+    nn = NotNode(matcher, join_on=['x'])
+    tn = TestNode()
+    nn.add_child(tn, tn.activate)
+
+    l1 = Token.valid(Fact(left=1), {'x': 1})
+    l2 = Token.valid(Fact(left=2), {'x': 2})
+    nn.activate_left(l1)
+    nn.activate_left(l2)
+    assert tn.added == [l1, l2]
+
+    nn.activate_right(Token.valid(Fact(right=1), {'x': 1}))
+    assert calls == [(1, 1)]
+    assert tn.added[2:] == [Token.invalid(Fact(left=1), {'x': 1})]
+    assert nn.left_memory[l1.to_info()] == 1
+    assert nn.left_memory[l2.to_info()] == 0
+
+    nn.activate_left(Token.valid(Fact(left=3), {'x': 1}))
+    assert calls == [(1, 1), (1, 1)]
+    assert len(tn.added) == 3
+
+    nn.activate_right(Token.invalid(Fact(right=1), {'x': 1}))
+    assert Token.valid(Fact(left=1), {'x': 1}) in tn.added[3:]
+    assert Token.valid(Fact(left=3), {'x': 1}) in tn.added[3:]
+
+
+def test_notnode_invalid_right_token_dont_call_matcher(TestNode):
+    from pyknow.matchers.rete.nodes import NotNode
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    calls = []
+
+    def matcher(l, r):
+        calls.append((l, r))
+        return True
+
+    nn = NotNode(matcher)
+    tn = TestNode()
+    nn.add_child(tn, tn.activate)
+
+    nn.activate_left(Token.valid(Fact(a=1)))
+    nn.activate_right(Token.valid(Fact(b=1)))
+    assert len(calls) == 1
+
+    nn.activate_right(Token.invalid(Fact(b=1)))
+
+    assert len(calls) == 1
+    assert nn.left_memory[Token.valid(Fact(a=1)).to_info()] == 0
+    assert tn.added == [Token.valid(Fact(a=1)),
+                        Token.invalid(Fact(a=1)),
+                        Token.valid(Fact(a=1))]
@@ -100,8 +100,11 @@ def test_ordinarymatchnode_left_activate_invalid_build_new_tokens(TestNode):
 
     rt1 = Token.valid(Fact(rightdata='rightdata1'))
     rt2 = Token.valid(Fact(rightdata='rightdata2'))
-    omn.right_memory.append(rt1.to_info())
-    omn.right_memory.append(rt2.to_info())
+    omn.activate_right(rt1)
+    omn.activate_right(rt2)
+    omn.activate_left(Token.valid(Fact(leftdata='leftdata')))
+    tn1.added.clear()
+    tn2.added.clear()
 
     token = Token.invalid(Fact(leftdata='leftdata'))
     omn.activate_left(token)
@@ -192,8 +195,11 @@ def test_ordinarymatchnode_right_activate_invalid_build_new_tokens(TestNode):
 
     rt1 = Token.valid(Fact(leftdata='leftdata1'))
     rt2 = Token.valid(Fact(leftdata='leftdata2'))
-    omn.left_memory.append(rt1.to_info())
-    omn.left_memory.append(rt2.to_info())
+    omn.activate_left(rt1)
+    omn.activate_left(rt2)
+    omn.activate_right(Token.valid(Fact(rightdata='rightdata')))
+    tn1.added.clear()
+    tn2.added.clear()
 
     token = Token.invalid(Fact(rightdata='rightdata'))
     omn.activate_right(token)
@@ -207,3 +213,132 @@ def test_ordinarymatchnode_right_activate_invalid_build_new_tokens(TestNode):
                                         Fact(leftdata='leftdata1')]),
                          Token.invalid([Fact(rightdata='rightdata'),
                                         Fact(leftdata='leftdata2')])]
+
+
+def test_ordinarymatchnode_only_match_same_join_values(TestNode):
+    from pyknow.matchers.rete.nodes import OrdinaryMatchNode
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    calls = []
+
+    def matcher(left, right):
+        calls.append((left['x'], right['x']))
+        return True
+
+    omn = OrdinaryMatchNode(matcher, join_on=['x'])
+    tn = TestNode()
+    omn.add_child(tn, tn.activate)
+
+    for i in range(10):
+        omn.activate_right(Token.valid(Fact(right=i), {'x': i % 5}))
+
+    omn.activate_left(Token.valid(Fact(left=1), {'x': 3}))
+
+    assert calls == [(3, 3), (3, 3)]
+    assert tn.added == [
+        Token.valid([Fact(left=1), Fact(right=3)], {'x': 3}),
+        Token.valid([Fact(left=1), Fact(right=8)], {'x': 3})]
+
+
+def test_ordinarymatchnode_invalid_tokens_dont_call_matcher(TestNode):
+    from pyknow.matchers.rete.nodes import OrdinaryMatchNode
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    calls = []
+
+    def matcher(l, r):
+        calls.append((l, r))
+        return l['x'] != r['y']
+
+    omn = OrdinaryMatchNode(matcher)
+    tn = TestNode()
+    omn.add_child(tn, tn.activate)
+
+    omn.activate_left(Token.valid(Fact(a=1), {'x': 1}))
+    omn.activate_left(Token.valid(Fact(a=2), {'x': 2}))
+    omn.activate_right(Token.valid(Fact(b=1), {'y': 1}))
+
+    assert len(calls) == 2
+    assert len(omn.lineage) == 1
+    tn.added.clear()
+
+    omn.activate_right(Token.invalid(Fact(b=1), {'y': 1}))
+    omn.activate_left(Token.invalid(Fact(a=2), {'x': 2}))
+
+    assert len(calls) == 2
+    assert not omn.lineage
+    assert tn.added == [Token.invalid([Fact(a=2), Fact(b=1)],
+                                      {'x': 2, 'y': 1})]
+
+
+def test_ordinarymatchnode_batch_activation(TestNode):
+    from pyknow.matchers.rete.nodes import OrdinaryMatchNode
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    class BatchNode(TestNode):
+        def __init__(self):
+            super().__init__()
+            self.batches = []
+
+        def activate_batch(self, tokens):
+            self.batches.append(tokens)
+
+    omn = OrdinaryMatchNode(lambda l, r: True, join_on=['x'])
+    tn = BatchNode()
+    omn.add_child(tn, tn.activate)
+
+    omn.activate_right_batch([Token.valid(Fact(r=i), {'x': i % 2})
+                              for i in range(4)])
+    assert tn.batches == []
+
+    omn.activate_left_batch([Token.valid(Fact(l=i), {'x': i})
+                             for i in range(3)])
+    assert len(tn.batches) == 1
+    assert sorted((t.context['x'], len(t.data)) for t in tn.batches[0]) \
+        == [(0, 2), (0, 2), (1, 2), (1, 2)]
+
+    omn.activate_left_batch([Token.invalid(Fact(l=0), {'x': 0})])
+    assert len(tn.batches) == 2
+    assert all(not t.is_valid() for t in tn.batches[1])
+    assert len(tn.batches[1]) == 2
+    assert tn.added == []
+
+
+def test_ordinarymatchnode_unlinks_ports_facing_empty_memory(TestNode):
+    from pyknow.matchers.rete.nodes import OrdinaryMatchNode
+    from pyknow.matchers.rete.nodes import FeatureTesterNode
+    from pyknow.matchers.rete.token import Token
+    from pyknow.fact import Fact
+
+    left = FeatureTesterNode(lambda f: True)
+    right = FeatureTesterNode(lambda f: True)
+    omn = OrdinaryMatchNode(lambda l, r: True)
+    tn = TestNode()
+    omn.add_child(tn, tn.activate)
+    left.add_child(omn, omn.activate_left)
+    omn.add_parent(left, 'activate_left')
+    right.add_child(omn, omn.activate_right)
+    omn.add_parent(right, 'activate_right')
+
+    assert left.children[0].callback == omn.store_left
+    assert right.children[0].callback == omn.store_right
+
+    left.activate(Token.valid(Fact(l=1)))
+    assert left.children[0].callback == omn.store_left
+    assert right.children[0].callback == omn.activate_right
+    assert tn.added == []
+
+    right.activate(Token.valid(Fact(r=1)))
+    assert left.children[0].callback == omn.activate_left
+    assert tn.added == [Token.valid([Fact(l=1), Fact(r=1)])]
+
+    left.activate(Token.invalid(Fact(l=1)))
+    assert tn.added[1:] == [Token.invalid([Fact(l=1), Fact(r=1)])]
+    assert right.children[0].callback == omn.store_right
+
+    right.activate(Token.invalid(Fact(r=1)))
+    assert left.children[0].callback == omn.store_left
+    assert not omn.left_memory and not omn.right_memory
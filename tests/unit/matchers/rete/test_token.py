@@ -77,12 +77,63 @@ def test_token_shortcut_invalid():
     assert Token.invalid([]) == Token(Token.TagType.INVALID, [])
 
 
-def test_token_copy_mutable():
+def test_token_copy_shares_inmutable_parts():
     from pyknow.matchers.rete.token import Token
 
-    a = Token.valid([])
+    a = Token.valid([], {'a': 1})
     b = a.copy()
 
     assert a == b and a is not b
-    assert a.data == b.data and a.data is not b.data
-    assert a.context == b.context and a.context is not b.context
+    assert a.data is b.data
+    assert a.context is b.context
+
+    with pytest.raises(TypeError):
+        b.context['a'] = 2
+
+
+def test_context_is_inmutable_mapping():
+    from collections.abc import Mapping
+    from pyknow.matchers.rete.token import Context
+
+    context = Context({'a': 1, (False, 'b'): 2})
+
+    assert isinstance(context, Mapping)
+    assert context == {'a': 1, (False, 'b'): 2}
+    assert context['a'] == 1
+    assert context.get('c') is None
+    assert (False, 'b') in context
+
+    with pytest.raises(TypeError):
+        context['a'] = 3
+
+
+def test_context_same_variables_share_layout():
+    from pyknow.matchers.rete.token import Context
+
+    a = Context({'a': 1, 'b': 2})
+    b = Context({'b': 2, 'a': 1})
+
+    assert a.layout is b.layout
+    assert a == b
+    assert hash(a) == hash(b)
+    assert Context(a) is a
+
+
+def test_context_extend():
+    from pyknow.matchers.rete.token import Context
+
+    context = Context({'a': 1})
+    extended = context.extend({'b': 2, 'a': 3})
+
+    assert context == {'a': 1}
+    assert extended == {'a': 3, 'b': 2}
+    assert context.extend({}) is context
+
+
+def test_context_join_drop_negated_and_prefer_other():
+    from pyknow.matchers.rete.token import Context
+
+    left = Context({'a': 1, 'b': 2, (False, 'c'): 3})
+    right = Context({'b': 4, 'c': 5, (False, 'a'): 6})
+
+    assert left.join(right) == {'a': 1, 'b': 4, 'c': 5}
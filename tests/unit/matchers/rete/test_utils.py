@@ -76,3 +76,21 @@ def test_illegal_CE():
 
     with pytest.raises(TypeError):
         KE()
+
+
+def test_get_bound_variables():
+    from pyknow import Rule, Fact, NOT, EXISTS, TEST, W, L, P
+
+    assert utils.get_bound_variables(Fact()) == set()
+    assert utils.get_bound_variables('f' << Fact(a=1)) == {'f'}
+    assert utils.get_bound_variables(
+        Fact(a=W('a'), b=L(1, 'b'), c=P(bool, 'c'), d=~W('d'))) \
+        == {'a', 'b', 'c'}
+    assert utils.get_bound_variables(Fact(a=W('a') & W('b'))) == {'a', 'b'}
+    assert utils.get_bound_variables(
+        Fact(a=L(1, 'a') | L(2, 'a'), b=L(1, 'b') | L(2))) == {'a'}
+    assert utils.get_bound_variables(
+        Rule(Fact(a=W('a')), Fact(b=W('b')))) == {'a', 'b'}
+    assert utils.get_bound_variables(NOT(Fact(a=W('a')))) == set()
+    assert utils.get_bound_variables(EXISTS(Fact(a=W('a')))) == set()
+    assert utils.get_bound_variables(TEST(lambda a: True)) == set()
@@ -36,3 +36,55 @@ def test_activation_in_set():
     from pyknow.activation import Activation
 
     assert Activation(None, []) in {Activation(None, [])}
+
+
+def test_activation_is_inmutable():
+    from pyknow.activation import Activation
+    from pyknow import Rule
+    import pytest
+
+    act = Activation(rule=Rule(), facts=[], context={'a': 1})
+
+    for attr in ('rule', 'facts', 'context'):
+        with pytest.raises(AttributeError):
+            setattr(act, attr, None)
+
+    with pytest.raises(AttributeError):
+        act.other = None
+
+    # MUST NOT RAISE
+    act.key = 1
+
+
+def test_activation_key_is_not_part_of_identity():
+    from pyknow.activation import Activation
+    from pyknow import Rule
+
+    rule = Rule()
+    act1 = Activation(rule, [], {'a': 1}, key=1)
+    act2 = Activation(rule, [], {'a': 1})
+
+    assert act1 == act2
+    assert hash(act1) == hash(act2)
+    assert act1 != Activation(rule, [], {'a': 2})
+
+
+def test_activation_get_kwargs():
+    from pyknow.activation import Activation
+
+    act = Activation(None, [], {'a': 1, '__b': 2, (False, 'c'): 3})
+
+    assert act.get_kwargs() == {'a': 1}
+
+
+def test_activation_accepts_any_mapping():
+    from pyknow.activation import Activation
+    from pyknow.matchers.rete.token import Context
+
+    context = {'a': 1}
+    act = Activation(None, [], context)
+    context['a'] = 2
+
+    assert act.context == {'a': 1}
+    assert act == Activation(None, [], Context({'a': 1}))
+    assert hash(act) == hash(Activation(None, [], Context({'a': 1})))
@@ -23,3 +23,135 @@ def test_agenda_get_next():
     agenda.activations.append("Foo")
     assert agenda.get_next() == "Foo"
     assert "Foo" not in agenda.activations
+
+
+def _activation(salience, *factids):
+    from pyknow.activation import Activation
+    from pyknow import Rule, Fact
+
+    facts = [Fact(__factid__=idx) for idx in factids]
+    act = Activation(Rule(salience=salience), facts)
+    act.key = (salience, sorted(factids, reverse=True))
+    return act
+
+
+def test_heapagenda_is_agenda():
+    from pyknow.agenda import Agenda, HeapAgenda
+
+    assert issubclass(HeapAgenda, Agenda)
+
+
+def test_heapagenda_same_order_as_agenda():
+    from random import Random
+    from pyknow.agenda import Agenda, HeapAgenda
+
+    rnd = Random(0)
+    acts = [_activation(rnd.randint(0, 3),
+                        *rnd.sample(range(10), rnd.randint(1, 3)))
+            for _ in range(100)]
+
+    agenda = Agenda()
+    heap = HeapAgenda()
+    for act in acts:
+        agenda.add(act)
+        heap.add(act)
+
+    for act in rnd.sample(acts, 40):
+        agenda.remove(act)
+        heap.remove(act)
+
+    assert heap.activations == agenda.activations
+    assert len(heap) == len(agenda) == 60
+
+    while agenda.activations:
+        assert heap.get_next() == agenda.get_next()
+
+    assert heap.get_next() is None
+    assert not heap
+
+
+def test_heapagenda_equal_keys_in_insertion_order():
+    from pyknow.agenda import HeapAgenda
+
+    heap = HeapAgenda()
+    acts = [_activation(0, 1, 2) for _ in range(3)]
+    for act in acts:
+        heap.add(act)
+
+    assert [heap.get_next() for _ in acts] == acts
+
+
+def test_heapagenda_remove():
+    from pyknow.agenda import HeapAgenda
+
+    heap = HeapAgenda()
+    act1 = _activation(0, 1)
+    act2 = _activation(0, 2)
+    heap.add(act1)
+    heap.add(act2)
+
+    heap.remove(act2)
+    heap.remove(act2)  # MUST NOT RAISE
+
+    assert act2 not in heap
+    assert act1 in heap
+    assert heap.get_next() is act1
+    assert heap.get_next() is None
+
+
+def test_salienceagenda_lifo_and_fifo():
+    from pyknow.agenda import SalienceAgenda
+
+    acts = [_activation(salience, idx)
+            for idx, salience in enumerate([0, 1, 0, 2, 1, 0])]
+    for act in acts:
+        act.key = act.rule.salience
+
+    lifo = SalienceAgenda()
+    fifo = SalienceAgenda(lifo=False)
+    for act in acts:
+        lifo.add(act)
+        fifo.add(act)
+
+    expected_lifo = [acts[3], acts[4], acts[1], acts[5], acts[2], acts[0]]
+    expected_fifo = [acts[3], acts[1], acts[4], acts[0], acts[2], acts[5]]
+
+    assert lifo.activations == expected_lifo[::-1]
+    assert fifo.activations == expected_fifo[::-1]
+    assert [lifo.get_next() for _ in acts] == expected_lifo
+    assert [fifo.get_next() for _ in acts] == expected_fifo
+    assert lifo.get_next() is None
+    assert fifo.get_next() is None
+
+
+def test_salienceagenda_remove():
+    from pyknow.agenda import SalienceAgenda
+
+    agenda = SalienceAgenda()
+    acts = [_activation(salience, idx)
+            for idx, salience in enumerate([0, 1, 1])]
+    for act in acts:
+        act.key = act.rule.salience
+        agenda.add(act)
+
+    agenda.remove(acts[2])
+    agenda.remove(acts[1])
+    agenda.remove(acts[1])  # MUST NOT RAISE
+
+    assert len(agenda) == 1
+    assert agenda._levels == [0]
+    assert acts[1] not in agenda
+    assert agenda.get_next() is acts[0]
+    assert agenda.get_next() is None
+
+
+def test_heapagenda_lifo_equal_keys():
+    from pyknow.agenda import HeapAgenda
+
+    agenda = HeapAgenda(lifo=True)
+    acts = [_activation(0, n) for n in range(3)]
+    for act in acts:
+        act.key = 0
+        agenda.add(act)
+
+    assert [agenda.get_next() for _ in acts] == acts[::-1]
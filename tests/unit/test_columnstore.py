@@ -0,0 +1,164 @@
+from array import array
+
+import pytest
+
+from pyknow.fact import Fact, FactTemplate, Field
+
+
+class Reading(FactTemplate):
+    __columnar__ = True
+    sensor = Field(int)
+    value = Field(float, default=0.0)
+    unit = Field(str, default='C')
+
+
+def _declared(idx, *args, **kwargs):
+    fact = Reading(*args, **kwargs)
+    fact.__factid__ = idx
+    return fact
+
+
+def test_columnstore_only_templates():
+    from pyknow.columnstore import ColumnStore
+
+    with pytest.raises(TypeError):
+        ColumnStore(Fact)
+
+
+def test_columnstore_columns():
+    from pyknow.columnstore import ColumnStore, UNSET
+
+    store = ColumnStore(Reading)
+    store.append(_declared(1, 1, 1.5))
+    store.append(_declared(3, 2, 2.5, 'F'))
+
+    assert store.column('sensor') == array('q', [1, 2])
+    assert store.column('value') == array('d', [1.5, 2.5])
+    assert store.column('unit') == [UNSET, 'F']
+
+    # A value not fitting in the array turns the column into a list.
+    store.append(_declared(4, 2 ** 70))
+    assert store.column('sensor') == [1, 2, 2 ** 70]
+
+    with pytest.raises(ValueError):
+        store.append(_declared(2, 1))
+
+
+def test_columnstore_unset_values_keep_arrays():
+    from pyknow.columnstore import ColumnStore, UNSET
+
+    store = ColumnStore(Reading)
+    store.append(_declared(1, 1, 1.5))
+    store.append(_declared(2, 2))
+
+    # The unset cells are marked in the bitmap of present values.
+    assert isinstance(store.columns[1], array)
+    assert store.present[1] == bytearray([1, 0])
+    assert store.column('value') == [1.5, UNSET]
+    assert store.find({'value': 0.0}) == [store.get(2)]
+    assert 'value' not in store.get(2)
+
+    store.remove(1)
+    assert store.column('value') == [UNSET]
+    store.append(_declared(3, 3, 3.5))
+    assert store.column('value') == [UNSET, 3.5]
+
+
+def test_columnstore_values_of_other_types_use_lists():
+    from pyknow.columnstore import ColumnStore, UNSET
+
+    store = ColumnStore(Reading)
+    store.append(_declared(1, 1))
+    store.append(_declared(2, 2, 2.5))
+
+    # A bool is not stored in an int array: the column becomes a list,
+    # with `UNSET` for the unset cells.
+    store.append(_declared(3, True))
+    assert store.column('sensor') == [1, 2, True]
+    assert store.present[0] is None
+    assert store.get(3)['sensor'] is True
+
+    store.append(_declared(4, 4, 4))
+    assert store.column('value') == [UNSET, 2.5, UNSET, 4]
+
+
+def test_columnstore_get_builds_unreferenced_facts():
+    from pyknow.columnstore import ColumnStore
+
+    store = ColumnStore(Reading)
+    fact = _declared(1, 1, 1.5)
+    store.append(fact)
+
+    assert store.get(1) is fact
+
+    del fact
+    built = store.get(1)
+    assert built == _declared(1, 1, 1.5)
+    assert built.__factid__ == 1
+    assert 'unit' not in built
+    assert store.get(1) is built
+
+    with pytest.raises(KeyError):
+        store.get(2)
+
+
+def test_columnstore_remove_and_compact():
+    from pyknow.columnstore import ColumnStore
+
+    store = ColumnStore(Reading)
+    for idx in range(1, 6):
+        store.append(_declared(idx, idx, float(idx)))
+
+    store.remove(2)
+    assert 2 not in store
+    assert list(store) == [1, 3, 4, 5]
+    assert store.dead == 1
+
+    store.remove(4)
+    store.remove(5)
+    assert store.dead == 0
+    assert list(store) == [1, 3]
+    assert store.column('value') == array('d', [1.0, 3.0])
+    assert store.get(3)['sensor'] == 3
+
+
+def test_columnstore_find_and_update():
+    from pyknow.columnstore import ColumnStore
+
+    store = ColumnStore(Reading)
+    facts = [_declared(1, 1, 1.5), _declared(2, 2, 1.5, 'F'),
+             _declared(3, 3, 2.5)]
+    for fact in facts:
+        store.append(fact)
+
+    assert store.find({'value': 1.5}) == facts[:2]
+    assert store.find({'value': 1.5, 'unit': 'C'}) == facts[:1]
+    assert store.find({'other': 1}) == []
+
+    facts[2]._setitem('value', 1.5)
+    store.update(facts[2])
+    assert store.find({'value': 1.5, 'unit': 'C'}) == [facts[0], facts[2]]
+
+
+def test_factlist_stores_columnar_facts_by_column():
+    from pyknow.factlist import FactList
+
+    fl = FactList()
+    fl.declare(Fact(a=1))
+    r1 = fl.declare(Reading(1, 1.5))
+    fl.declare(Fact(a=2))
+    r2 = fl.declare(Reading(2, 2.5))
+
+    assert Reading in fl.column_stores
+    assert len(fl) == 4
+    assert list(fl) == [0, 1, 2, 3]
+    assert fl[1] is r1
+    assert 3 in fl
+    assert fl.query(Reading, value=2.5) == [r2]
+    assert fl.of_type(Reading) == [r1, r2]
+    assert fl.declare(Reading(1, 1.5)) is None
+
+    fl.retract(r1)
+    assert 1 not in fl
+    assert list(fl) == [0, 2, 3]
+    assert fl.of_type(Reading) == [r2]
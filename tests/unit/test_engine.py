@@ -869,6 +869,128 @@ def test_modify_retracts_and_declare():
     assert f2['key'] == 'test_key'
 
 
+def test_modify_slot_specific_fact():
+    from pyknow import KnowledgeEngine, Fact, Rule, W, NOT
+
+    class Order(Fact):
+        __slot_specific__ = True
+
+    executed = []
+
+    class KE(KnowledgeEngine):
+        @Rule(Order(status='open', id=W('i')))
+        def is_open(self, i):
+            executed.append('is_open')
+
+        @Rule(Order(name=W('n')))
+        def named(self, n):
+            executed.append('named')
+
+        @Rule(Order(id=W('i')), NOT(Order(status='closed', id=W('i'))))
+        def not_closed(self, i):
+            executed.append('not_closed')
+
+    ke = KE()
+    ke.reset()
+    order = ke.declare(Order(id=1, name='x', status='open'))
+    ke.run()
+    assert sorted(executed) == ['is_open', 'named', 'not_closed']
+
+    executed.clear()
+    factid = order.__factid__
+    assert ke.modify(order, status='closed') is order
+    assert order.__factid__ == factid
+    assert order['status'] == 'closed'
+    assert ke.facts[factid] is order
+    ke.run()
+    assert executed == []
+
+    ke.modify(order, status='open')
+    ke.run()
+    assert sorted(executed) == ['is_open', 'not_closed']
+
+    executed.clear()
+    ke.modify(order, status='open')
+    ke.run()
+    assert executed == []
+
+    ke.retract(order)
+    assert factid not in ke.facts
+
+
+def test_modify_slot_specific_fact_to_duplicate():
+    from pyknow import KnowledgeEngine, Fact
+
+    class Order(Fact):
+        __slot_specific__ = True
+
+    ke = KnowledgeEngine()
+    ke.reset()
+    f1 = ke.declare(Order(status='open'))
+    f2 = ke.declare(Order(status='closed'))
+
+    assert ke.modify(f2, status='open') is None
+    assert list(ke.facts.values()) == [ke.facts[0], f1]
+
+
+def test_upsert_replaces_fact_with_same_key():
+    from pyknow import KnowledgeEngine, Fact, Field, Rule, W
+
+    class Sensor(Fact):
+        id = Field(int, key=True)
+        value = Field(int)
+
+    executed = []
+
+    class KE(KnowledgeEngine):
+        @Rule(Sensor(id=W('i'), value=W('v')))
+        def reading(self, i, v):
+            executed.append((i, v))
+
+    ke = KE()
+    ke.reset()
+
+    f1 = ke.upsert(Sensor(id=1, value=10))
+    ke.run()
+    assert executed == [(1, 10)]
+
+    f2 = ke.upsert(Sensor(id=1, value=20))
+    assert f1.__factid__ not in ke.facts
+    assert ke.facts.get_by_key(Sensor(id=1)) is f2
+    assert len(ke.agenda) == 1
+
+    assert ke.upsert(Sensor(id=1, value=20)) is f2
+    ke.run()
+    assert executed == [(1, 10), (1, 20)]
+
+    with pytest.raises(ValueError):
+        ke.modify(ke.declare(Sensor(id=2, value=0)), id=1)
+
+
+def test_upsert_rejected_fact_keeps_declared_one():
+    from pyknow import KnowledgeEngine, Fact, Field, L
+
+    class Sensor(Fact):
+        id = Field(int, key=True)
+        value = Field(int)
+
+    ke = KnowledgeEngine()
+    ke.reset()
+
+    f1 = ke.upsert(Sensor(id=1, value=10))
+
+    with pytest.raises(ValueError):
+        ke.upsert(Sensor(id=1, value='high'))
+    with pytest.raises(TypeError):
+        ke.upsert(Sensor(id=1, value=L(20)))
+    with pytest.raises(ValueError):
+        ke.upsert(Sensor(value=20))
+
+    assert ke.facts.get_by_key(Sensor(id=1)) is f1
+    assert list(ke.facts.values()) == [ke.facts[0], f1]
+    assert ke.facts.same_contents(f1, Sensor(id=1, value=10))
+
+
 def test_duplicate_declare():
     from pyknow import KnowledgeEngine, Fact
 
@@ -956,3 +1078,81 @@ def test_reset_kwargs_are_passed_to_multiple_deffacts():
     ke = KE()
     ke.reset(arg0=0, arg1=1)
     assert passed == {0, 1}
+
+
+def test_match_subclasses():
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+
+    class Vehicle(Fact):
+        __match_subclasses__ = True
+
+    class Car(Vehicle):
+        pass
+
+    class Bike(Fact):
+        pass
+
+    executed = []
+
+    class KE(KnowledgeEngine):
+        @Rule(Vehicle(wheels=W('wheels')))
+        def vehicle(self, wheels):
+            executed.append(wheels)
+
+    ke = KE()
+    ke.reset()
+    ke.declare(Vehicle(wheels=6), Car(wheels=4), Bike(wheels=2))
+    ke.run()
+
+    assert sorted(executed) == [4, 6]
+
+
+def test_KnowledgeEngine_columnar_facts():
+    from pyknow import KnowledgeEngine, Rule, FactTemplate, Field, W, P
+
+    class Reading(FactTemplate):
+        __columnar__ = True
+        __slot_specific__ = True
+        sensor = Field(int)
+        value = Field(float)
+
+    hot = []
+
+    class KE(KnowledgeEngine):
+        @Rule('f' << Reading(sensor=W('s'), value=P(lambda v: v > 10)))
+        def is_hot(self, f, s):
+            hot.append(f)
+
+    ke = KE()
+    ke.reset()
+    for sensor in range(10):
+        ke.declare(Reading(sensor, float(sensor)))
+    ke.run()
+    assert hot == []
+
+    fact = ke.facts.query(Reading, sensor=3)[0]
+    assert ke.modify(fact, value=30.0) is fact
+    ke.run()
+    assert hot == [fact]
+    assert ke.facts.query(Reading, value=30.0) == [fact]
+
+    ke.retract(fact)
+    assert ke.facts.query(Reading, sensor=3) == []
+
+
+def test_KnowledgeEngine_batch_validate_declares_none_if_invalid():
+    from pyknow import KnowledgeEngine, Fact, Field
+
+    class Batched(Fact):
+        __batch_validate__ = True
+        a = Field(int)
+
+    ke = KnowledgeEngine()
+    ke.reset()
+
+    with pytest.raises(ValueError):
+        ke.declare(Batched(a=1), Batched(a='2'))
+    assert len(ke.facts) == 1
+
+    assert ke.declare(Batched(a=1), Batched(a=2))['a'] == 2
+    assert len(ke.facts) == 3
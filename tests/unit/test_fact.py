@@ -2,7 +2,7 @@ from unittest.mock import MagicMock
 
 import pytest
 
-from pyknow.fact import Fact, Field
+from pyknow.fact import Fact, FactTemplate, Field
 from pyknow.engine import KnowledgeEngine
 
 
@@ -171,3 +171,162 @@ def test_fields_default_are_called_once_per_instance():
     f2 = MockFact()
     assert f2["myfield"] == "TEST"
     assert mymock.call_count == 2
+
+
+class PickledReading(FactTemplate):
+    sensor = Field(int)
+    value = Field(float, default=0.0)
+    payload = Field(dict, default=dict)
+
+
+def test_facttemplate_fields_in_slots():
+    from pyknow.fact import FactTemplate
+
+    class Reading(FactTemplate):
+        sensor = Field(int, key=True)
+        value = Field(float, default=0.0)
+
+    assert Reading.__slots__ == ('sensor', 'value')
+
+    f = Reading(3, value=20.5)
+    assert f.sensor == f['sensor'] == 3
+    assert f.value == f['value'] == 20.5
+    assert f.items() == [('sensor', 3), ('value', 20.5)]
+    assert f == Reading(sensor=3, value=20.5)
+    assert hash(f) == hash(Reading(3, 20.5))
+    assert f.copy() == f
+
+    f = Reading(3)
+    assert 'value' not in f
+    assert f['value'] == f.value == 0.0
+    assert f.get('value') is None
+
+    with pytest.raises(KeyError):
+        Reading(other=1)
+    with pytest.raises(TypeError):
+        Reading(1, 2.0, 3)
+
+    assert not hasattr(f, '__dict__')
+
+
+def test_facttemplate_pickle_and_copy():
+    import copy
+    import pickle
+
+    f = PickledReading(3, payload={'status': 'ok'})
+    f['payload__status'] = 'ok'
+    f.__factid__ = 5
+    f.__bind__ = 'r'
+
+    for other in (pickle.loads(pickle.dumps(f)), copy.copy(f)):
+        assert other == f
+        assert other.items() == f.items()
+        assert other.__factid__ == 5
+        assert other.__bind__ == 'r'
+        assert 'value' not in other
+        assert other.value == 0.0
+
+
+def test_facttemplate_inheritance_and_clashes():
+    from pyknow.fact import FactTemplate
+
+    class Base(FactTemplate):
+        a = Field(int)
+
+    class Child(Base):
+        a = Field(int, default=1)
+        b = Field(int)
+
+    assert Child.__slots__ == ('b', )
+    assert Child(b=2).items() == [('b', 2)]
+    assert Child(b=2)['a'] == 1
+    assert Child(3, 4).items() == [('a', 3), ('b', 4)]
+
+    with pytest.raises(TypeError):
+        class Clash(FactTemplate):
+            copy = Field(int)
+
+
+def test_facttemplate_fields_of_fact_mixins():
+    from pyknow.fact import FactTemplate
+
+    class Measure(Fact):
+        __slots__ = ()
+        unit = Field(str, default='C')
+
+    class Reading(FactTemplate, Measure):
+        value = Field(float)
+
+    assert Reading.__slots__ == ('unit', 'value')
+
+    f = Reading(value=20.5)
+    assert f.unit == f['unit'] == 'C'
+    assert Reading('F', 68.9).items() == [('unit', 'F'), ('value', 68.9)]
+    assert not hasattr(f, '__dict__')
+
+
+def test_facttemplate_in_engine():
+    from pyknow import Rule, W, P
+    from pyknow.fact import FactTemplate
+
+    class Reading(FactTemplate):
+        __slot_specific__ = True
+        sensor = Field(int, key=True)
+        value = Field(float)
+
+    hot = []
+
+    class KE(KnowledgeEngine):
+        @Rule('f' << Reading(sensor=W('s'), value=P(lambda v: v > 10)))
+        def is_hot(self, f, s):
+            hot.append((s, f))
+
+    ke = KE()
+    ke.reset()
+    f1 = ke.declare(Reading(1, 5.0))
+    f2 = ke.declare(Reading(2, 15.0))
+    assert ke.declare(Reading(2, 15.0)) is None
+
+    with pytest.raises(RuntimeError):
+        f1['value'] = 1.0
+
+    ke.run()
+    assert hot == [(2, f2)]
+
+    assert ke.modify(f1, value=20.0) is f1
+    ke.run()
+    assert hot[-1] == (1, f1)
+    assert f1.value == 20.0
+    assert ke.facts.get_by_key(Reading(sensor=1)) is f1
+    assert ke.facts.query(Reading, value=20.0) == [f1]
+
+
+def test_fact_validate_batch():
+    class MockFact(Fact):
+        a = Field(int, mandatory=True)
+        b = Field(str)
+
+    MockFact.validate_batch([MockFact(a=1), MockFact(a=2, b='x')])
+
+    with pytest.raises(ValueError) as exc:
+        MockFact.validate_batch([MockFact(a=1), MockFact(b='x')])
+    assert 'Mandatory' in str(exc.value)
+
+    with pytest.raises(ValueError) as exc:
+        MockFact.validate_batch([MockFact(a=1), MockFact(a=1, b=2)])
+    assert "field 'b'" in str(exc.value)
+
+
+def test_fact_digest_is_cached_until_changed():
+    f = Fact(a=1)
+    digest = f.__digest__
+    assert f._digest == digest
+    assert digest == Fact(a=1).__digest__
+
+    f['b'] = 2
+    assert f._digest is None
+    assert f.__digest__ == Fact(a=1, b=2).__digest__
+    assert f.__digest__ != digest
+
+    f.__factid__ = 1
+    assert f.__digest__ == Fact(a=1, b=2).__digest__
@@ -87,3 +87,186 @@ def test_factlist_raises_valueerror_on_invalid_fact():
 
     with pytest.raises(ValueError):
         flist.declare(f0)
+
+
+def test_factlist_modify_in_place():
+    from pyknow.factlist import FactList
+    from pyknow import Fact
+
+    flist = FactList()
+
+    f0 = flist.declare(Fact(a=1))
+    flist.changes
+
+    assert flist.modify(f0, {'a': 2, 'b': [1]}) is f0
+    assert flist[0] is f0
+    assert f0['a'] == 2
+    assert f0['b'] == (1, )
+    assert flist.changes == ([], [])
+
+    assert flist.is_declared(Fact(a=2, b=[1]))
+    assert not flist.is_declared(Fact(a=1))
+    assert flist.declare(Fact(a=1)) is not None
+
+    flist.retract(f0)
+    assert not flist.is_declared(Fact(a=2, b=[1]))
+
+    with pytest.raises(IndexError):
+        flist.modify(f0, {'a': 3})
+
+
+def test_factlist_key_index():
+    from pyknow.factlist import FactList
+    from pyknow import Fact, Field
+
+    class Sensor(Fact):
+        id = Field(int, key=True)
+        value = Field(int)
+
+    flist = FactList()
+
+    with pytest.raises(TypeError):
+        flist.get_by_key(Fact(id=1))
+
+    assert flist.get_by_key(Sensor(id=1)) is None
+
+    f0 = flist.declare(Sensor(id=1, value=10))
+    f1 = flist.declare(Sensor(id=2, value=10))
+    assert flist.get_by_key(Sensor(id=1)) is f0
+    assert flist.get_by_key(Sensor(id=2)) is f1
+
+    with pytest.raises(ValueError):
+        flist.declare(Sensor(id=1, value=20))
+
+    flist.modify(f0, {'id': 3})
+    assert flist.get_by_key(Sensor(id=1)) is None
+    assert flist.get_by_key(Sensor(id=3)) is f0
+
+    with pytest.raises(ValueError):
+        flist.modify(f0, {'id': 2})
+
+    flist.retract(f0)
+    assert flist.get_by_key(Sensor(id=3)) is None
+
+
+def test_factlist_of_type():
+    from pyknow.factlist import FactList
+    from pyknow import Fact
+
+    class Order(Fact):
+        pass
+
+    class SpecialOrder(Order):
+        pass
+
+    flist = FactList()
+    o1 = flist.declare(Order(a=1))
+    flist.declare(Fact(a=1))
+    o2 = flist.declare(SpecialOrder(a=2))
+    o3 = flist.declare(Order(a=3))
+
+    assert flist.of_type(Order) == [o1, o2, o3]
+    assert flist.of_type(SpecialOrder) == [o2]
+
+    flist.retract(o2)
+    assert flist.of_type(Order) == [o1, o3]
+    assert flist.of_type(SpecialOrder) == []
+
+
+def test_factlist_query():
+    from pyknow.factlist import FactList
+    from pyknow import Fact, Field
+
+    class Order(Fact):
+        status = Field(str, index=True)
+
+    flist = FactList()
+    o1 = flist.declare(Order(status='open', customer=1))
+    o2 = flist.declare(Order(status='closed', customer=1))
+    o3 = flist.declare(Order(status='open', customer=2))
+    flist.declare(Order(customer=3))
+
+    assert Order.__index_fields__ == ('status', )
+    assert flist.query(Order, status='open') == [o1, o3]
+    assert flist.query(Order, status='open', customer=2) == [o3]
+    assert flist.query(Order, customer=1) == [o1, o2]
+    assert flist.query(Order, status='unknown') == []
+
+    flist.modify(o1, {'status': 'closed'})
+    assert flist.query(Order, status='open') == [o3]
+    assert flist.query(Order, status='closed') == [o1, o2]
+
+    flist.retract(o3)
+    assert flist.query(Order, status='open') == []
+    assert not flist.indexes[(Order, 'status')].get('open')
+
+
+def test_factlist_add_index():
+    from pyknow.factlist import FactList
+    from pyknow import Fact
+
+    class Order(Fact):
+        pass
+
+    flist = FactList()
+    o1 = flist.declare(Order(customer=1, lines=[1, 2]))
+    flist.declare(Order(customer=2))
+
+    flist.add_index(Order, 'customer')
+    flist.add_index(Order, 'lines')
+    assert len(flist.indexes[(Order, 'customer')]) == 2
+
+    o3 = flist.declare(Order(customer=1))
+    assert list(flist.indexes[(Order, 'customer')][1]) == [
+        o1.__factid__, o3.__factid__]
+    assert list(flist.type_index[Order]) == [
+        o1.__factid__, o1.__factid__ + 1, o3.__factid__]
+    assert flist.query(Order, customer=1) == [o1, o3]
+    assert flist.query(Order, lines=[1, 2]) == [o1]
+
+
+def test_factlist_duplicates_by_digest(monkeypatch):
+    from pyknow.factlist import FactList
+    from pyknow import Fact
+
+    flist = FactList()
+    f0 = flist.declare(Fact(a=1))
+    assert flist.contents == {f0.__digest__: 0}
+    assert flist.declare(Fact(a=1)) is None
+
+    # Facts with the same digest but different contents are declared.
+    monkeypatch.setattr(Fact, '__digest__', property(lambda self: 0))
+    flist = FactList()
+    f0 = flist.declare(Fact(a=1))
+    f1 = flist.declare(Fact(a=2))
+    assert f1 is not None
+    assert flist.declare(Fact(a=2)) is None
+    assert flist.contents == {0: [0, 1]}
+
+    flist.retract(f0)
+    assert flist.contents == {0: 1}
+    flist.retract(f1)
+    assert flist.contents == {}
+
+
+def test_factlist_duplication_per_class():
+    from pyknow.factlist import FactList
+    from pyknow import Fact
+
+    class Event(Fact):
+        __duplication__ = True
+
+    class Unique(Fact):
+        __duplication__ = False
+
+    flist = FactList()
+    assert flist.declare(Event(a=1)) is not None
+    assert flist.declare(Event(a=1)) is not None
+    assert flist.is_declared(Event(a=1))
+    assert len(flist.contents) == 0
+
+    flist.duplication = True
+    assert flist.declare(Fact(a=1)) is not None
+    assert flist.declare(Fact(a=1)) is not None
+    assert flist.declare(Unique(a=1)) is not None
+    assert flist.declare(Unique(a=1)) is None
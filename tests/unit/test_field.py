@@ -17,3 +17,33 @@ def test_field_default_is_NODEFAULT():
     f1 = Field(int)
 
     assert f1.default is Field.NODEFAULT
+
+
+def test_field_key_is_mandatory():
+    from pyknow import Fact
+
+    class Sensor(Fact):
+        id = Field(int, key=True)
+        value = Field(int)
+
+    assert Field(int).key is False
+    assert Sensor.__key_fields__ == ('id', )
+    assert Fact.__key_fields__ == ()
+    assert Sensor.__fields__['id'].mandatory
+
+
+def test_field_compiled_check_reports_schema_errors():
+    from schema import SchemaError, Use
+    import pytest
+
+    f1 = Field(int)
+    assert f1.check is not None
+    f1.validate(1)
+    with pytest.raises(SchemaError):
+        f1.validate('1')
+
+    f2 = Field(Use(int))
+    assert f2.check is None
+    f2.validate('1')
+    with pytest.raises(SchemaError):
+        f2.validate('a')
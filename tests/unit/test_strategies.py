@@ -255,3 +255,192 @@ def test_DepthStrategy_update_agenda_different_salience():
             > order.index(act3)
             > order.index(act2)
             > order.index(act1))
+
+
+def test_DepthStrategy_uses_heapagenda():
+    from pyknow.strategies import DepthStrategy
+    from pyknow.agenda import HeapAgenda
+    from pyknow import KnowledgeEngine
+
+    assert isinstance(DepthStrategy().new_agenda(), HeapAgenda)
+    assert isinstance(KnowledgeEngine().agenda, HeapAgenda)
+
+
+def test_SalienceDepthStrategy_in_engine():
+    from pyknow.strategies import SalienceDepthStrategy
+    from pyknow.strategies import SalienceBreadthStrategy
+    from pyknow.agenda import SalienceAgenda
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+
+    for strategy, expected in ((SalienceDepthStrategy, [9, 2, 1, 0]),
+                               (SalienceBreadthStrategy, [9, 0, 1, 2])):
+        executed = []
+
+        class KE(KnowledgeEngine):
+            __strategy__ = strategy
+
+            @Rule(Fact(n=W('n')))
+            def low(self, n):
+                executed.append(n)
+
+            @Rule(Fact(n=9), salience=1)
+            def high(self):
+                executed.append(9)
+
+        ke = KE()
+        assert isinstance(ke.agenda, SalienceAgenda)
+
+        ke.reset()
+        for n in range(3):
+            ke.declare(Fact(n=n))
+        ke.declare(Fact(n=9))
+        ke.run()
+
+        assert executed[0] == 9
+        assert [n for n in executed[1:] if n != 9] == expected[1:]
+
+
+def test_HeapStrategy_is_abstract():
+    from pyknow.strategies import HeapStrategy
+
+    class NoKey(HeapStrategy):
+        pass
+
+    with pytest.raises(TypeError):
+        HeapStrategy()
+
+    with pytest.raises(TypeError):
+        NoKey()
+
+
+def test_DepthStrategy_is_HeapStrategy():
+    from pyknow.strategies import DepthStrategy, HeapStrategy
+
+    assert issubclass(DepthStrategy, HeapStrategy)
+    assert DepthStrategy().new_agenda().lifo
+
+
+def _fire_order(strategy):
+    from pyknow import KnowledgeEngine, Rule, Fact, W
+
+    executed = []
+
+    class KE(KnowledgeEngine):
+        __strategy__ = strategy
+
+        @Rule(Fact(a=W('x')), Fact(b=W('x')))
+        def ab(self, x):
+            executed.append(('ab', x))
+
+        @Rule(Fact(a=W('x')))
+        def a(self, x):
+            executed.append(('a', x))
+
+        @Rule(Fact(b=W('x')), Fact(a=W('x')))
+        def ba(self, x):
+            executed.append(('ba', x))
+
+    ke = KE()
+    ke.reset()
+    # a1 = 1, b1 = 2, a2 = 3, b2 = 4
+    for x in (1, 2):
+        ke.declare(Fact(a=x))
+        ke.declare(Fact(b=x))
+    ke.run()
+
+    return executed
+
+
+def test_LEXStrategy_orders_by_fact_recency():
+    from pyknow.strategies import LEXStrategy
+
+    executed = _fire_order(LEXStrategy)
+
+    # `ab` and `ba` match the same facts.
+    assert set(executed[0:2]) == {('ab', 2), ('ba', 2)}
+    assert executed[2] == ('a', 2)
+    assert set(executed[3:5]) == {('ab', 1), ('ba', 1)}
+    assert executed[5] == ('a', 1)
+
+
+def test_MEAStrategy_orders_by_first_pattern_recency():
+    from pyknow.strategies import MEAStrategy
+
+    assert _fire_order(MEAStrategy) == [('ba', 2), ('ab', 2), ('a', 2),
+                                        ('ba', 1), ('ab', 1), ('a', 1)]
+
+
+def test_MEAStrategy_uses_the_fact_matched_by_the_first_pattern():
+    from pyknow import KnowledgeEngine, Rule, Fact, W, TEST
+    from pyknow.strategies import MEAStrategy
+
+    executed = []
+
+    class KE(KnowledgeEngine):
+        __strategy__ = MEAStrategy
+
+        # Both facts pass the checks of the first pattern.
+        @Rule(Fact(a=W('x')), Fact(a=W('y')), TEST(lambda x, y: x != y))
+        def pair(self, x, y):
+            executed.append((x, y))
+
+    ke = KE()
+    ke.reset()
+    ke.declare(Fact(a=1))
+    ke.declare(Fact(a=2))
+    ke.run()
+
+    assert executed == [(2, 1), (1, 2)]
+
+
+def test_SimplicityStrategy_and_ComplexityStrategy():
+    from pyknow.strategies import SimplicityStrategy, ComplexityStrategy
+
+    simple = _fire_order(SimplicityStrategy)
+    assert simple[:2] == [('a', 2), ('a', 1)]
+
+    complex_ = _fire_order(ComplexityStrategy)
+    assert complex_[-2:] == [('a', 2), ('a', 1)]
+
+
+def test_RandomStrategy_same_seed_same_keys():
+    from pyknow.activation import Activation
+    from pyknow.strategies import RandomStrategy
+    from pyknow import Rule
+
+    acts = [Activation(Rule(salience=1), []) for _ in range(5)]
+
+    def _keys(strategy):
+        return [strategy.get_key(act) for act in acts]
+
+    keys = _keys(RandomStrategy(seed=42))
+    assert keys == _keys(RandomStrategy(seed=42))
+    assert keys != _keys(RandomStrategy(seed=43))
+    assert all(key[0] == 1 for key in keys)
+
+    assert sorted(_fire_order(RandomStrategy)) == sorted(
+        _fire_order(RandomStrategy))
+
+
+def test_BreadthStrategy_runs_activations_in_order():
+    from pyknow.strategies import BreadthStrategy
+
+    executed = _fire_order(BreadthStrategy)
+
+    assert executed[0] == ('a', 1)
+    assert set(executed[1:3]) == {('ab', 1), ('ba', 1)}
+    assert executed[3] == ('a', 2)
+    assert set(executed[4:6]) == {('ab', 2), ('ba', 2)}
+
+
+def test_get_specificity():
+    from pyknow import Rule, Fact, W, L, P, OR, TEST
+    from pyknow.strategies import get_specificity
+
+    assert get_specificity(Rule(Fact(a=W('x')))) == 0
+    assert get_specificity(Rule(Fact(a=W('x')), Fact(b=W('x')))) == 1
+    assert get_specificity(Rule(Fact(a=1, b=P(bool)))) == 2
+    assert get_specificity(Rule(Fact(a=L(1) | L(2)))) == 2
+    assert get_specificity(Rule(Fact(a=W('x')),
+                                TEST(lambda x: x))) == 1
+    assert get_specificity(Rule(OR(Fact(a=1), Fact(a=1, b=2)))) == 2
@@ -0,0 +1,57 @@
+import pytest
+import schema
+
+from pyknow.utils import freeze, unfreeze
+
+
+DEFINITIONS = [
+    int, str, float, bool, list, dict, set, tuple, object,
+    (int, str), [int], [str, [int]], {int}, [],
+    schema.Or(int, None), schema.Or('m', 'f'),
+    schema.And(int, lambda x: x > 0),
+    schema.Optional(int), schema.Schema([str]),
+    lambda x: isinstance(x, list) and len(x) == 2,
+    lambda x: x > 3,
+    'literal', 3, None,
+]
+
+VALUES = [
+    1, -1, 5, True, 1.5, 'm', 'literal', None, (1, 'a'), (1, 2.0), [1, 2],
+    ['a', [1]], ['a', ['b']], [], {1, 2}, {'a'}, {'a': 1}, {'a': [1, 2]},
+]
+
+
+@pytest.mark.parametrize('definition', DEFINITIONS)
+def test_compile_schema_is_equivalent_to_schema(definition):
+    from pyknow.validation import compile_schema
+
+    check = compile_schema(definition)
+    assert check is not None
+
+    for value in VALUES:
+        try:
+            schema.Schema(definition).validate(unfreeze(freeze(value)))
+        except schema.SchemaError:
+            expected = False
+        else:
+            expected = True
+
+        assert check(freeze(value)) is expected, value
+
+
+@pytest.mark.parametrize('definition', [{str: int}, schema.Use(int)])
+def test_compile_schema_not_compiled(definition):
+    from pyknow.validation import compile_schema
+
+    assert compile_schema(definition) is None
+
+
+def test_compile_schema_callable_only_catches_exceptions():
+    from pyknow.validation import compile_schema
+
+    def interrupted(value):
+        raise KeyboardInterrupt()
+
+    assert compile_schema(lambda x: 1 / x)(0) is False
+    with pytest.raises(KeyboardInterrupt):
+        compile_schema(interrupted)(1)
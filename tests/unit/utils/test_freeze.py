@@ -78,3 +78,27 @@ def test_unfreeze_frozenset():
     expected = {1, 2, 3}
     assert actual == expected
     assert isinstance(actual, type(expected))
+
+
+def test_freeze_returns_frozen_values_unchanged():
+    frozen = freeze({"a": [1, {"b": {2}}]})
+
+    assert freeze(frozen) is frozen
+    assert freeze(frozen["a"]) is frozen["a"]
+
+    # Frozen subtrees are shared by the new containers.
+    actual = freeze({"c": frozen, "d": [frozen["a"]]})
+    assert actual["c"] is frozen
+    assert actual["d"][0] is frozen["a"]
+
+
+def test_freeze_frozen_containers_with_mutable_values():
+    actual = freeze(frozendict(a=[1]))
+    assert actual == frozendict(a=frozenlist([1]))
+    assert isinstance(actual["a"], frozenlist)
+    hash(actual)
+
+    actual = freeze(frozenlist([{"a": 1}]))
+    assert actual == frozenlist([frozendict(a=1)])
+    assert isinstance(actual[0], frozendict)
+    hash(actual)